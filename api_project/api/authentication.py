@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+
+def token_cache_key(key):
+    return f"api:token:{key}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps each token's (user, token) in the
+    default cache for TOKEN_AUTH_CACHE_TTL seconds instead of running
+    the Token + user join on every request. api.signals drops the entry
+    when the token or its user changes.
+    """
+
+    def authenticate_credentials(self, key):
+        # The cache hands out a fresh unpickled copy each time, so nothing
+        # a view sets on request.user leaks into other requests.
+        cached = cache.get(token_cache_key(key))
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            cache.set(token_cache_key(key), cached, getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60))
+        return cached
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache_key
+
+User = get_user_model()
+
+
+def _forget(keys):
+    keys = [token_cache_key(key) for key in keys]
+    cache.delete_many(keys)
+    # Again after commit, in case a request re-cached the old row meanwhile.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    _forget([instance.key])
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    # The cached user would be stale (e.g. is_active); deleting a user
+    # deletes its token, which is handled above.
+    _forget(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
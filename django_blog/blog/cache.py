@@ -0,0 +1,138 @@
+import datetime
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.views.decorators.http import condition
+
+from .models import Post
+
+LIST_VERSION_KEY = "blog:lists:v"
+
+# Versions are re-minted after this; cached pages and fragments keyed
+# on the old one just miss once.
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def versioned_cache_enabled():
+    """
+    Bumping a version only reaches other processes through a shared
+    cache. With locmem every other worker would keep serving its stale
+    copy until VERSION_TIMEOUT, so versioned caching is off there unless
+    BLOG_CACHE_ALLOW_LOCAL_CACHE says the site runs as one process.
+    """
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return getattr(settings, "BLOG_CACHE_ALLOW_LOCAL_CACHE", False)
+    return True
+
+
+def fragment_timeout(timeout=600):
+    """Timeout for {% cache %} fragments keyed on a version: 0 (no caching) when versions are local."""
+    return timeout if versioned_cache_enabled() else 0
+
+
+def _version_key(post_id):
+    return f"blog:post:{post_id}:v"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def post_version(post_id):
+    """
+    Current version token for a post's cached fragments. Fragments are
+    keyed on it, so bumping the version orphans every one of them.
+    None if there is no such post: ids come from URLs, and minting a
+    version for each made-up one would fill the cache.
+    """
+    key = _version_key(post_id)
+    version = cache.get(key)
+    if version is None and Post.objects.filter(pk=post_id).exists():
+        version = _get_version(key)
+    return version
+
+
+def bump_post_version(post_id):
+    cache.delete(_version_key(post_id))
+
+
+def list_version():
+    """Version token shared by every post listing (index, tags, archives)."""
+    return _get_version(LIST_VERSION_KEY)
+
+
+def bump_list_version():
+    cache.delete(LIST_VERSION_KEY)
+
+
+def version_timestamp(version):
+    # Versions are minted (as time_ns) on the first read after a change,
+    # so they never predate the change and double as Last-Modified.
+    return datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc)
+
+
+def versioned_page(get_version, timeout=600):
+    """
+    View decorator for public pages whose content is fully described by
+    get_version(**view_kwargs).
+
+    Responses carry an ETag and Last-Modified derived from the version,
+    so revalidating clients get a 304, and anonymous GETs are served
+    from a per-URL page cache keyed on the same version. Bumping the
+    version purges both. A None version (no such post) skips both and
+    leaves the response to the view, as does versioned_cache_enabled()
+    being false.
+    """
+    def version(request, *args, **kwargs):
+        if not hasattr(request, "_page_version"):
+            request._page_version = get_version(**kwargs) if versioned_cache_enabled() else None
+        return request._page_version
+
+    def etag(request, *args, **kwargs):
+        if version(request, *args, **kwargs) is None:
+            return None
+        # Signed-in pages show per-user links, so they must not share validators.
+        return f"{version(request, *args, **kwargs)}-{request.user.pk or 0}"
+
+    def last_modified(request, *args, **kwargs):
+        if version(request, *args, **kwargs) is None:
+            return None
+        return version_timestamp(version(request, *args, **kwargs))
+
+    def decorator(view):
+        @condition(etag_func=etag, last_modified_func=last_modified)
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if (
+                request.method not in ("GET", "HEAD")
+                or request.user.is_authenticated
+                or version(request, *args, **kwargs) is None
+            ):
+                return view(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f"blog:page:{version(request, *args, **kwargs)}:{path}"
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+
+            def store(response):
+                if response.status_code == 200 and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+                    cache.set(key, response, timeout)
+
+            if getattr(response, "is_rendered", True):
+                store(response)
+            else:
+                response.add_post_render_callback(store)
+            return response
+        return wrapped
+    return decorator
@@ -12,6 +12,9 @@ class PostForm(forms.ModelForm):
         }
 
 class CommentForm(forms.ModelForm):
+    # Id of the comment being replied to; resolved against the post in the view.
+    parent = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Comment
         fields = ["content"]
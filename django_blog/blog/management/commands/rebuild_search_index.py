@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the blog post search index (title, tags, content) from the database."
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write("Rebuilt blog post search index.")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE blog_post_fts USING fts5(title, tags, content, tokenize='unicode61')"
+    )
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts (rowid, title, tags, content) "
+        "SELECT p.id, p.title, COALESCE(GROUP_CONCAT(t.name, ' '), ''), p.content "
+        "FROM blog_post p "
+        "LEFT JOIN taggit_taggeditem ti ON ti.object_id = p.id AND ti.content_type_id = %s "
+        "LEFT JOIN taggit_tag t ON t.id = ti.tag_id "
+        "GROUP BY p.id",
+        [content_type.pk if content_type else None],
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_post_tags'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
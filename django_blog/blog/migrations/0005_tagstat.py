@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_tag_stats(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    TagStat = apps.get_model("blog", "TagStat")
+    Post = apps.get_model("blog", "Post")
+
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    if content_type is None:
+        return
+    rows = (
+        TaggedItem.objects.filter(content_type=content_type)
+        .values("tag_id")
+        .annotate(post_count=Count("object_id"), last_id=Max("object_id"))
+    )
+    published = dict(Post.objects.values_list("id", "published_date"))
+    TagStat.objects.bulk_create(
+        TagStat(tag_id=row["tag_id"], post_count=row["post_count"], last_used=published.get(row["last_id"]))
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_search_index'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStat',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='taggit.tag')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('last_used', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-post_count'],
+                'indexes': [models.Index(fields=['-post_count', 'tag'], name='tagstat_popular_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_tag_stats, migrations.RunPython.noop),
+    ]
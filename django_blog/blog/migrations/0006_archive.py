@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_month_archive(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    MonthArchive = apps.get_model("blog", "MonthArchive")
+    rows = (
+        Post.objects.annotate(year=ExtractYear("published_date"), month=ExtractMonth("published_date"))
+        .values("year", "month")
+        .annotate(post_count=Count("id"))
+        .order_by()
+    )
+    MonthArchive.objects.bulk_create(
+        MonthArchive(year=row["year"], month=row["month"], post_count=row["post_count"]) for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_tagstat'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['published_date', 'id'], name='post_published_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='montharchive',
+            constraint=models.UniqueConstraint(fields=('year', 'month'), name='unique_archive_month'),
+        ),
+        migrations.RunPython(backfill_month_archive, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.urls import reverse
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
 # Create your models here.
 class Post(models.Model):
@@ -11,9 +13,54 @@ class Post(models.Model):
 
     tags = TaggableManager()  # NEW
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["published_date", "id"], name="post_published_id_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse("post-detail", kwargs={"pk": self.pk})
+
+
+class PostSearchEntry(models.Model):
+    """
+    A row of the SQLite FTS5 index created by migration 0004, keyed by
+    post id as its rowid. Unmanaged: blog.search writes it with raw SQL,
+    and the model only lets search_posts join it.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_entry",
+    )
+    title = models.TextField()
+    tags = models.TextField()
+    content = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = "blog_post_fts"
+
+
+# Each path segment is a comment id in fixed-width base36, so sorting by
+# path lists a thread depth-first and a subtree is one range of paths.
+PATH_SEGMENT_WIDTH = 7
+MAX_THREAD_DEPTH = 30
+
+
+def path_segment(pk):
+    digits = ""
+    while pk:
+        pk, digit = divmod(pk, 36)
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"[digit] + digits
+    return digits.rjust(PATH_SEGMENT_WIDTH, "0")
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
@@ -22,5 +69,58 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Threading, filled in by blog.signals when the comment is created.
+    parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies")
+    path = models.CharField(max_length=255, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)  # all descendants
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["post", "path"], name="comment_post_path_idx"),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.author} on {self.post}"
+
+    @property
+    def ancestor_ids(self):
+        return [int(segment, 36) for segment in self.path.split("/")[:-1]]
+
+    def descendants(self):
+        """Every reply below this comment, in thread order, via one range on (post, path)."""
+        return Comment.objects.filter(
+            post_id=self.post_id, path__gt=f"{self.path}/", path__lt=f"{self.path}0"
+        ).order_by("path")
+
+
+class TagStat(models.Model):
+    """Materialized per-tag usage, kept current by blog.signals."""
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    post_count = models.PositiveIntegerField(default=0)
+    last_used = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-post_count"]
+        indexes = [
+            models.Index(fields=["-post_count", "tag"], name="tagstat_popular_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tag} ({self.post_count})"
+
+
+class MonthArchive(models.Model):
+    """Posts published per month, kept current by blog.signals for the archive sidebar."""
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(fields=["year", "month"], name="unique_archive_month"),
+        ]
+
     def __str__(self):
-        return f"Comment by {self.author} on {self.post}"
\ No newline at end of file
+        return f"{self.year}-{self.month:02d} ({self.post_count})"
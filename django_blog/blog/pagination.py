@@ -0,0 +1,68 @@
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+
+class KeysetPaginationMixin:
+    """
+    ListView pagination on (published_date, id), newest first.
+
+    Pages are addressed with ?before=<cursor> (older) and ?after=<cursor>
+    (newer) instead of page numbers, so each page is an index range scan
+    rather than an OFFSET over everything newer. Provides newer_url and
+    older_url in the context.
+    """
+    page_size = 10
+
+    @staticmethod
+    def encode_cursor(post):
+        return f"{post.published_date.isoformat()}~{post.pk}"
+
+    @staticmethod
+    def decode_cursor(value):
+        published, _, pk = value.rpartition("~")
+        published = parse_datetime(published)
+        if published is None or not pk.isdigit():
+            raise Http404("Invalid page cursor.")
+        return published, int(pk)
+
+    def paginate_keyset(self, queryset):
+        before = self.request.GET.get("before")
+        after = self.request.GET.get("after")
+
+        if after:
+            published, pk = self.decode_cursor(after)
+            queryset = queryset.filter(
+                Q(published_date__gt=published) | Q(published_date=published, id__gt=pk)
+            ).order_by("published_date", "id")
+        else:
+            if before:
+                published, pk = self.decode_cursor(before)
+                queryset = queryset.filter(
+                    Q(published_date__lt=published) | Q(published_date=published, id__lt=pk)
+                )
+            queryset = queryset.order_by("-published_date", "-id")
+
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if after:
+            page.reverse()
+            has_newer, has_older = has_more, True
+        else:
+            has_newer, has_older = bool(before), has_more
+        return page, has_newer, has_older
+
+    def page_url(self, **cursor):
+        query = self.request.GET.copy()
+        query.pop("before", None)
+        query.pop("after", None)
+        query.update(cursor)
+        return f"?{query.urlencode()}"
+
+    def get_context_data(self, **kwargs):
+        page, has_newer, has_older = self.paginate_keyset(self.object_list)
+        context = super().get_context_data(object_list=page, **kwargs)
+        context["newer_url"] = self.page_url(after=self.encode_cursor(page[0])) if has_newer and page else None
+        context["older_url"] = self.page_url(before=self.encode_cursor(page[-1])) if has_older and page else None
+        return context
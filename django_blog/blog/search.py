@@ -0,0 +1,79 @@
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PostSearchEntry
+
+FTS_TABLE = PostSearchEntry._meta.db_table
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def index_post(post):
+    """Write post's title, content and tag names into the search index."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, tags, content) VALUES (%s, %s, %s, %s)",
+            [post.pk, post.title, " ".join(post.tags.names()), post.content],
+        )
+
+
+def remove_post(post_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+
+
+def rebuild_index():
+    if not fts_available():
+        return
+    content_type = ContentType.objects.get_for_model(Post)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, tags, content) "
+            "SELECT p.id, p.title, COALESCE(GROUP_CONCAT(t.name, ' '), ''), p.content "
+            "FROM blog_post p "
+            "LEFT JOIN taggit_taggeditem ti ON ti.object_id = p.id AND ti.content_type_id = %s "
+            "LEFT JOIN taggit_tag t ON t.id = ti.tag_id "
+            "GROUP BY p.id",
+            [content_type.pk],
+        )
+
+
+def search_posts(query):
+    """
+    Posts matching every word of query (as a prefix) in the title, tags
+    or content, best match first. Title hits weigh most, then tags.
+    """
+    tokens = TOKEN_RE.findall(query or "")[:16]
+    if not tokens:
+        return Post.objects.none()
+
+    if not fts_available():
+        posts = Post.objects.all()
+        for token in tokens:
+            posts = posts.filter(
+                Q(title__icontains=token) | Q(content__icontains=token) | Q(tags__name__icontains=token)
+            )
+        return posts.distinct().order_by("-published_date")
+
+    match = " ".join(f'"{token}"*' for token in tokens)
+    # One join with the FTS table: MATCH runs once and bm25 (lower is
+    # better) is read per joined row instead of per-row subqueries.
+    return (
+        Post.objects.filter(search_entry__isnull=False)
+        .filter(RawSQL(f"{FTS_TABLE} MATCH %s", [match], output_field=BooleanField()))
+        .annotate(rank=RawSQL(f"bm25({FTS_TABLE}, 10.0, 5.0, 1.0)", [], output_field=FloatField()))
+        .order_by("rank", "-published_date")
+    )
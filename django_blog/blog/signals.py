@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_list_version, bump_post_version
+from .models import Comment, MonthArchive, Post, TagStat, path_segment
+
+
+def update_tag_stats(tag_ids, delta):
+    """Shift post_count for tag_ids by delta, creating missing stat rows."""
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return
+    TagStat.objects.bulk_create([TagStat(tag_id=tag_id) for tag_id in tag_ids], ignore_conflicts=True)
+    changes = {"post_count": Greatest(F("post_count") + delta, 0)}
+    if delta > 0:
+        changes["last_used"] = timezone.now()
+    TagStat.objects.filter(tag_id__in=tag_ids).update(**changes)
+    cache.delete(make_template_fragment_key("tag_cloud"))
+
+
+def update_month_archive(published_date, delta):
+    """Shift the post count of published_date's month by delta."""
+    published = timezone.localtime(published_date)
+    MonthArchive.objects.bulk_create(
+        [MonthArchive(year=published.year, month=published.month)], ignore_conflicts=True
+    )
+    MonthArchive.objects.filter(year=published.year, month=published.month).update(
+        post_count=Greatest(F("post_count") + delta, 0)
+    )
+    cache.delete(make_template_fragment_key("archive_months"))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tag_changes(sender, instance, action, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_post_version(instance.pk)
+        bump_list_version()
+    # taggit reports only the tags actually added or removed.
+    if action == "post_add":
+        update_tag_stats(pk_set, 1)
+    elif action == "post_remove":
+        update_tag_stats(pk_set, -1)
+    elif action == "pre_clear":
+        update_tag_stats(instance.tags.values_list("id", flat=True), -1)
+
+
+@receiver(pre_delete, sender=Post)
+def count_deleted_post_tags(sender, instance, **kwargs):
+    update_tag_stats(instance.tags.values_list("id", flat=True), -1)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post_month(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_month_archive(instance.published_date, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post_month(sender, instance, **kwargs):
+    update_month_archive(instance.published_date, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_fragments(sender, instance, **kwargs):
+    bump_post_version(instance.pk)
+    bump_list_version()
+
+
+@receiver(post_save, sender=Comment)
+def thread_new_comment(sender, instance, created, raw=False, **kwargs):
+    if not created or raw or instance.path:
+        return
+    segment = path_segment(instance.pk)
+    instance.path = f"{instance.parent.path}/{segment}" if instance.parent_id else segment
+    instance.depth = instance.path.count("/")
+    Comment.objects.filter(pk=instance.pk).update(path=instance.path, depth=instance.depth)
+    Comment.objects.filter(pk__in=instance.ancestor_ids).update(reply_count=F("reply_count") + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_reply(sender, instance, **kwargs):
+    # A cascade sends this once per removed descendant, so surviving
+    # ancestors end up decremented by the size of the removed subtree.
+    Comment.objects.filter(pk__in=instance.ancestor_ids).update(reply_count=Greatest(F("reply_count") - 1, 0))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_fragments(sender, instance, **kwargs):
+    bump_post_version(instance.post_id)
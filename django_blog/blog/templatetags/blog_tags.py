@@ -0,0 +1,30 @@
+from django import template
+
+from blog.models import MonthArchive, TagStat
+
+register = template.Library()
+
+
+@register.inclusion_tag("blog/tag_cloud.html")
+def tag_cloud(limit=30):
+    """
+    Most used tags from the materialized TagStat table, each with a
+    size from 1 to 5 relative to the most popular one. Wrap the tag in
+    {% cache ... tag_cloud %} so this only runs after a tag changes.
+    """
+    stats = list(TagStat.objects.filter(post_count__gt=0).select_related("tag")[:limit])
+    top = stats[0].post_count if stats else 1
+    tags = [
+        {"name": s.tag.name, "slug": s.tag.slug, "count": s.post_count, "size": 1 + (4 * s.post_count) // top}
+        for s in sorted(stats, key=lambda s: s.tag.name.lower())
+    ]
+    return {"tags": tags}
+
+
+@register.inclusion_tag("blog/archive_months.html")
+def archive_months():
+    """
+    Months with posts, newest first, read from the MonthArchive count
+    table rather than grouping the posts. Cache as {% cache ... archive_months %}.
+    """
+    return {"months": MonthArchive.objects.filter(post_count__gt=0)}
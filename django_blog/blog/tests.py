@@ -1,3 +1,339 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+import datetime
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Comment, MonthArchive, Post, TagStat
+from .search import search_posts
+
+
+class PostSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.client.force_login(self.user)
+
+    def create_post(self, title, content, tags="general"):
+        response = self.client.post(reverse("post-create"), {"title": title, "content": content, "tags": tags})
+        self.assertEqual(response.status_code, 302)
+        return Post.objects.get(title=title)
+
+    def search(self, query, page=1):
+        response = self.client.get(reverse("post-search"), {"q": query, "page": page})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_matches_title_content_and_tags_ranked(self):
+        in_content = self.create_post("Notes", "all about python packaging")
+        in_tags = self.create_post("Weekend", "hiking", tags="python, outdoors")
+        in_title = self.create_post("Python tricks", "misc")
+        self.create_post("Rust", "ownership")
+
+        posts = list(self.search("pyth").context["posts"])
+        self.assertEqual(posts, [in_title, in_tags, in_content])
+
+    def test_update_reindexes(self):
+        post = self.create_post("Old title", "body")
+        self.client.post(reverse("post-update", args=[post.pk]), {"title": "Fresh title", "content": "body", "tags": "new"})
+        self.assertEqual(len(self.search("old").context["posts"]), 0)
+        self.assertEqual(list(self.search("fresh").context["posts"]), [post])
+        self.assertEqual(list(self.search("new").context["posts"]), [post])
+
+    def test_results_are_paginated(self):
+        for i in range(12):
+            Post.objects.create(title=f"Django {i}", content="", author=self.user)
+        call_command("rebuild_search_index", stdout=StringIO())
+        first = self.search("django")
+        self.assertTrue(first.context["is_paginated"])
+        self.assertEqual(len(first.context["posts"]), 10)
+        self.assertEqual(len(self.search("django", page=2).context["posts"]), 2)
+
+    def test_fts_match_runs_once(self):
+        sql, params = search_posts("django").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertNotIn("CORRELATED", plan)
+        self.assertEqual(plan.count("blog_post_fts"), 1)
+
+
+class TagStatTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+
+    def stats(self):
+        return {s.tag.slug: s.post_count for s in TagStat.objects.select_related("tag")}
+
+    def test_stats_follow_tag_changes_and_deletes(self):
+        first = Post.objects.create(title="One", content="", author=self.user)
+        first.tags.add("django", "python")
+        second = Post.objects.create(title="Two", content="", author=self.user)
+        second.tags.set(["python"])
+        self.assertEqual(self.stats(), {"django": 1, "python": 2})
+
+        first.tags.remove("django")
+        second.delete()
+        self.assertEqual(self.stats(), {"django": 0, "python": 1})
+        first.tags.clear()
+        self.assertEqual(self.stats(), {"django": 0, "python": 0})
+
+    def test_tag_cloud_is_cached_until_tags_change(self):
+        post = Post.objects.create(title="One", content="", author=self.user)
+        post.tags.add("django")
+        self.assertContains(self.client.get(reverse("tag-cloud")), "django")
+        with self.assertNumQueries(0):
+            self.client.get(reverse("tag-cloud"))
+        post.tags.add("htmx")
+        self.assertContains(self.client.get(reverse("tag-cloud")), "htmx")
+
+    def test_tag_listing_is_paginated_newest_first(self):
+        posts = [Post.objects.create(title=f"P{i}", content="", author=self.user) for i in range(12)]
+        for post in posts:
+            post.tags.add("django")
+        response = self.client.get(reverse("posts_by_tag", args=["django"]))
+        self.assertEqual(list(response.context["posts"]), posts[::-1][:10])
+        self.assertEqual(self.client.get(reverse("posts_by_tag", args=["nope"])).status_code, 404)
+
+
+class PostFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Cached", content="body", author=self.user)
+        self.post.tags.add("django")
+        for i in range(3):
+            Comment.objects.create(post=self.post, author=self.user, content=f"comment {i}")
+        self.url = reverse("post-detail", args=[self.post.pk])
+
+    def test_detail_queries_do_not_grow_with_comments(self):
+        with self.assertNumQueries(4):  # version (post exists), post+author, tags, comments+authors
+            self.client.get(self.url)
+
+    def test_detail_renders_fragments_from_cache(self):
+        self.client.force_login(self.user)  # anonymous hits are whole-page cached
+        self.client.get(self.url)
+        with self.assertNumQueries(3):  # session, user, post+author
+            response = self.client.get(self.url)
+        self.assertContains(response, "comment 2")
+        self.assertContains(response, "django")
+
+    def test_new_comment_and_edit_invalidate_fragments(self):
+        self.client.get(self.url)
+        Comment.objects.create(post=self.post, author=self.user, content="fresh comment")
+        self.assertContains(self.client.get(self.url), "fresh comment")
+        self.post.content = "edited body"
+        self.post.save()
+        self.assertContains(self.client.get(self.url), "edited body")
+
+    def test_list_joins_authors(self):
+        for i in range(5):
+            Post.objects.create(title=f"P{i}", content="", author=self.user)
+        self.client.get(reverse("post-list"))  # warm the tag cloud fragment
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("post-list"), {"page": 1})
+            self.assertEqual(len(response.context["posts"]), 6)
+
+
+class PostListKeysetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.posts = [Post.objects.create(title=f"P{i}", content="", author=self.user) for i in range(25)]
+        # Shared timestamps must still page in a stable order.
+        Post.objects.update(published_date=timezone.now())
+        self.newest_first = sorted(self.posts, key=lambda p: p.pk, reverse=True)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_walks_older_and_back_newer(self):
+        first = self.get(reverse("post-list"))
+        self.assertEqual(list(first.context["posts"]), self.newest_first[:10])
+        self.assertIsNone(first.context["newer_url"])
+
+        second = self.get(reverse("post-list") + first.context["older_url"])
+        self.assertEqual(list(second.context["posts"]), self.newest_first[10:20])
+        third = self.get(reverse("post-list") + second.context["older_url"])
+        self.assertEqual(list(third.context["posts"]), self.newest_first[20:])
+        self.assertIsNone(third.context["older_url"])
+
+        back = self.get(reverse("post-list") + third.context["newer_url"])
+        self.assertEqual(list(back.context["posts"]), self.newest_first[10:20])
+        self.assertIsNotNone(back.context["newer_url"])
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(reverse("post-list"), {"before": "junk"}).status_code, 404)
+
+
+class MonthArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+
+    def create_post(self, title, year, month):
+        post = Post.objects.create(title=title, content="", author=self.user)
+        # published_date is auto_now_add, so backdate it directly.
+        published = timezone.make_aware(datetime.datetime(year, month, 15))
+        Post.objects.filter(pk=post.pk).update(published_date=published)
+        return post
+
+    def test_counts_follow_creates_and_deletes(self):
+        now = timezone.localtime()
+        first = Post.objects.create(title="One", content="", author=self.user)
+        Post.objects.create(title="Two", content="", author=self.user)
+        self.assertEqual(MonthArchive.objects.get(year=now.year, month=now.month).post_count, 2)
+        first.delete()
+        self.assertEqual(MonthArchive.objects.get(year=now.year, month=now.month).post_count, 1)
+
+    def test_year_and_month_views(self):
+        march = self.create_post("March", 2024, 3)
+        december = self.create_post("December", 2024, 12)
+        self.create_post("Next year", 2025, 1)
+
+        response = self.client.get(reverse("post-archive-year", args=[2024]))
+        self.assertEqual(list(response.context["posts"]), [december, march])
+        response = self.client.get(reverse("post-archive-month", args=[2024, 12]))
+        self.assertEqual(list(response.context["posts"]), [december])
+        self.assertEqual(self.client.get(reverse("post-archive-month", args=[2024, 13])).status_code, 404)
+
+    def test_sidebar_reads_the_count_table(self):
+        self.client.force_login(self.user)
+        Post.objects.create(title="One", content="", author=self.user)
+        now = timezone.localtime()
+        month_url = reverse("post-archive-month", args=[now.year, now.month])
+        self.assertContains(self.client.get(reverse("post-list")), month_url)
+        with self.assertNumQueries(3):  # session, user, posts; both sidebars are cached
+            self.client.get(reverse("post-list"))
+        Post.objects.create(title="Two", content="", author=self.user)
+        self.assertContains(self.client.get(reverse("post-list")), "(2)")
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Cached", content="body", author=self.user)
+        self.post.tags.add("django")
+        self.url = reverse("post-detail", args=[self.post.pk])
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for url in (self.url, reverse("post-list"), reverse("posts_by_tag", args=["django"])):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertContains(self.client.get(url), "Cached")
+
+    def test_revalidation_returns_304_until_content_changes(self):
+        response = self.client.get(self.url)
+        etag, modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 304)
+        self.assertEqual(self.client.get(self.url, headers={"if-modified-since": modified}).status_code, 304)
+
+        Comment.objects.create(post=self.post, author=self.user, content="new comment")
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "new comment")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_changes_purge_cached_pages(self):
+        list_url = reverse("post-list")
+        self.client.get(self.url)
+        self.client.get(list_url)
+        self.post.title = "Renamed"
+        self.post.save()
+        self.assertContains(self.client.get(self.url), "Renamed")
+        self.assertContains(self.client.get(list_url), "Renamed")
+        self.post.tags.add("htmx")
+        self.assertContains(self.client.get(self.url), "htmx")
+
+    def test_missing_post_mints_no_version(self):
+        response = self.client.get(reverse("post-detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertIsNone(cache.get("blog:post:999999:v"))
+
+    def test_signed_in_readers_bypass_page_cache(self):
+        anonymous_etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, headers={"if-none-match": anonymous_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Edit")
+
+    @override_settings(BLOG_CACHE_ALLOW_LOCAL_CACHE=False)
+    def test_local_cache_serves_no_cached_pages(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+        with self.assertNumQueries(3):  # post, tags, comments: no cached fragments either
+            self.assertContains(self.client.get(self.url), "Cached")
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Threads", content="", author=self.user)
+
+    def comment(self, content, parent=None):
+        return Comment.objects.create(post=self.post, author=self.user, content=content, parent=parent)
+
+    def test_paths_and_reply_counts(self):
+        root = self.comment("root")
+        child = self.comment("child", parent=root)
+        grandchild = self.comment("grandchild", parent=child)
+        sibling = self.comment("sibling", parent=root)
+        other = self.comment("other root")
+
+        self.assertEqual(grandchild.depth, 2)
+        self.assertEqual(grandchild.ancestor_ids, [root.pk, child.pk])
+        self.assertEqual(list(root.descendants()), [child, grandchild, sibling])
+        self.assertEqual(list(other.descendants()), [])
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 3)
+
+        child.delete()  # cascades to grandchild
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
+        self.assertEqual(list(root.descendants()), [sibling])
+
+    def test_replies_page_loads_more(self):
+        root = self.comment("root")
+        replies = [self.comment(f"reply {i}", parent=root) for i in range(25)]
+        url = reverse("comment-replies", args=[root.pk])
+        with self.assertNumQueries(2):  # root comment, replies page
+            first = self.client.get(url)
+        self.assertEqual(list(first.context["replies"]), replies[:20])
+        second = self.client.get(url + first.context["more_url"])
+        self.assertEqual(list(second.context["replies"]), replies[20:])
+        self.assertIsNone(second.context["more_url"])
+
+    def test_reply_form_and_detail_shows_roots_only(self):
+        root = self.comment("root comment")
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("add-comment", args=[self.post.pk]), {"content": "a reply", "parent": root.pk}
+        )
+        self.assertRedirects(response, reverse("comment-replies", args=[root.pk]))
+        reply = Comment.objects.get(content="a reply")
+        self.assertEqual(reply.parent, root)
+
+        detail = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.assertEqual(list(detail.context["comments"]), [root])
+        self.assertContains(detail, "1 reply")
+
+    def test_bad_parent_is_rejected(self):
+        self.client.force_login(self.user)
+        url = reverse("add-comment", args=[self.post.pk])
+        response = self.client.post(url, {"content": "a reply", "parent": "abc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context["form"], "parent", "Enter a whole number.")
+        self.assertEqual(self.client.post(url, {"content": "a reply", "parent": 999999}).status_code, 404)
+        self.assertFalse(Comment.objects.exists())
@@ -17,8 +17,12 @@ urlpatterns = [
     path("post/<int:pk>/update/", PostUpdateView.as_view(), name="post-update"),
     path("post/<int:pk>/delete/", PostDeleteView.as_view(), name="post-delete"),
     path("post/<int:pk>/comments/new/", views.CommentCreateView.as_view(), name="add-comment"),
+    path("comment/<int:pk>/replies/", views.CommentRepliesView.as_view(), name="comment-replies"),
     path("comment/<int:pk>/update/", views.CommentUpdateView.as_view(), name="comment-update"),
     path("comment/<int:pk>/delete/", views.CommentDeleteView.as_view(), name="comment-delete"),
+    path("tags/", views.TagCloudView.as_view(), name="tag-cloud"),
     path("tags/<slug:tag_slug>/", PostByTagListView.as_view(), name="posts_by_tag"),
+    path("archive/<int:year>/", views.PostArchiveView.as_view(), name="post-archive-year"),
+    path("archive/<int:year>/<int:month>/", views.PostArchiveView.as_view(), name="post-archive-month"),
     path("search/", views.PostSearchListView.as_view(), name="post-search"),
 ]
\ No newline at end of file
@@ -1,3 +1,5 @@
+import datetime
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
@@ -6,14 +8,19 @@ from django.contrib.auth.models import User
 from django import forms
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.urls import reverse_lazy
+from django.http import Http404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from .models import Post
 from .forms import PostForm
 from .forms import CommentForm
-from .models import Comment
+from .models import Comment, MAX_THREAD_DEPTH
 from taggit.models import Tag
-from django.db.models import Q
+from .search import index_post, remove_post, search_posts
+from .cache import fragment_timeout, list_version, post_version, versioned_page
+from .pagination import KeysetPaginationMixin
 
 # Create your views here.
 
@@ -74,18 +81,38 @@ def profile_view(request):
 
 
 # List all posts
-class PostListView(ListView):
+@method_decorator(versioned_page(lambda **kwargs: list_version()), name="dispatch")
+class PostListView(KeysetPaginationMixin, ListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
-    ordering = ["-published_date"]  # newest first
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("author")
 
 
 # Show single post
+@method_decorator(versioned_page(lambda pk: post_version(pk)), name="dispatch")
 class PostDetailView(DetailView):
     model = Post
     template_name = "blog/post_detail.html"
 
+    def get_queryset(self):
+        return Post.objects.select_related("author")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Lazy querysets: only evaluated when their cached fragment misses.
+        context["tags"] = self.object.tags.all()
+        # Top-level comments only; replies load per thread from CommentRepliesView.
+        context["comments"] = (
+            self.object.comments.filter(parent__isnull=True).select_related("author").order_by("created_at")
+        )
+        context["cache_version"] = post_version(self.object.pk)
+        context["fragment_timeout"] = fragment_timeout()
+        context["form"] = CommentForm()
+        return context
+
 
 # Create a new post
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -95,7 +122,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        index_post(self.object)  # after save_m2m, so tags are in
+        return response
 
 
 # Update a post
@@ -106,7 +135,9 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        index_post(self.object)
+        return response
 
     def test_func(self):
         post = self.get_object()
@@ -119,6 +150,12 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     template_name = "blog/post_confirm_delete.html"
     success_url = reverse_lazy("blog:post-list")
 
+    def form_valid(self, form):
+        post_id = self.object.pk
+        response = super().form_valid(form)
+        remove_post(post_id)
+        return response
+
     def test_func(self):
         post = self.get_object()
         return self.request.user == post.author
@@ -134,16 +171,53 @@ class CommentCreateView(CreateView):
         post = get_object_or_404(Post, pk=self.kwargs["pk"])
         form.instance.post = post
         form.instance.author = self.request.user
+        parent_id = form.cleaned_data["parent"]
+        if parent_id is not None:
+            parent = get_object_or_404(Comment, pk=parent_id, post=post)
+            if parent.depth + 1 >= MAX_THREAD_DEPTH:
+                parent = parent.parent  # keep the thread within the path limit
+            form.instance.parent = parent
         return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse_lazy("blog:post-detail", kwargs={"pk": self.kwargs["pk"]})
+        if self.object.parent_id:
+            root_id = self.object.ancestor_ids[0]
+            return reverse_lazy("comment-replies", kwargs={"pk": root_id})
+        return reverse_lazy("post-detail", kwargs={"pk": self.kwargs["pk"]})
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return redirect("login")
         return super().dispatch(request, *args, **kwargs)
 
+# Replies under one comment, in thread order, a page at a time
+class CommentRepliesView(ListView):
+    template_name = "blog/comment_replies.html"
+    context_object_name = "replies"
+    page_size = 20
+
+    def get_queryset(self):
+        self.comment = get_object_or_404(Comment.objects.select_related("author", "post"), pk=self.kwargs["pk"])
+        replies = self.comment.descendants().select_related("author")
+        after = self.request.GET.get("after")
+        if after:
+            replies = replies.filter(path__gt=after)
+        return replies[:self.page_size + 1]
+
+    def get_context_data(self, **kwargs):
+        replies = list(self.object_list)
+        has_more = len(replies) > self.page_size
+        replies = replies[:self.page_size]
+        for reply in replies:
+            reply.indent = reply.depth - self.comment.depth - 1
+        context = super().get_context_data(object_list=replies, **kwargs)
+        context["comment"] = self.comment
+        context["more_url"] = f"?after={replies[-1].path}" if has_more else None
+        context["reply_to"] = self.request.GET.get("reply_to", self.comment.pk)
+        context["form"] = CommentForm()
+        return context
+
+
 # Update Comment
 class CommentUpdateView(UpdateView):
     model = Comment
@@ -174,8 +248,9 @@ class CommentDeleteView(DeleteView):
         return super().dispatch(request, *args, **kwargs)
 
 
-# List posts by tag
-class PostByTagListView(ListView):
+# List posts by tag, newest first, a page at a time
+@method_decorator(versioned_page(lambda **kwargs: list_version()), name="dispatch")
+class PostByTagListView(KeysetPaginationMixin, ListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
@@ -183,7 +258,7 @@ class PostByTagListView(ListView):
     def get_queryset(self):
         tag_slug = self.kwargs.get("tag_slug")
         tag = get_object_or_404(Tag, slug=tag_slug)
-        return Post.objects.filter(tags__in=[tag])
+        return Post.objects.filter(tags=tag).select_related("author")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -191,17 +266,54 @@ class PostByTagListView(ListView):
         return context
     
 
+# Posts from one year or month; a range scan on the published_date index
+@method_decorator(versioned_page(lambda **kwargs: list_version()), name="dispatch")
+class PostArchiveView(KeysetPaginationMixin, ListView):
+    model = Post
+    template_name = "blog/post_list.html"
+    context_object_name = "posts"
+
+    def get_date_range(self):
+        year, month = self.kwargs["year"], self.kwargs.get("month")
+        try:
+            if month is None:
+                start, end = datetime.datetime(year, 1, 1), datetime.datetime(year + 1, 1, 1)
+            else:
+                start = datetime.datetime(year, month, 1)
+                end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+        except ValueError:
+            raise Http404("Invalid archive date.")
+        return timezone.make_aware(start), timezone.make_aware(end)
+
+    def get_queryset(self):
+        start, end = self.get_date_range()
+        return Post.objects.filter(
+            published_date__gte=start, published_date__lt=end
+        ).select_related("author")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["archive_year"] = self.kwargs["year"]
+        context["archive_month"] = self.kwargs.get("month")
+        return context
+
+
+# Tag cloud, rendered from the materialized TagStat table
+class TagCloudView(TemplateView):
+    template_name = "blog/tags.html"
+
+
 class PostSearchListView(ListView):
     model = Post
     template_name = "blog/search_results.html"
     context_object_name = "posts"
+    paginate_by = 10
 
     def get_queryset(self):
-        query = self.request.GET.get("q")
-        if query:
-            return Post.objects.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__name__icontains=query)
-            ).distinct()
-        return Post.objects.none()
\ No newline at end of file
+        # Ranked full-text match over title, tags and content
+        return search_posts(self.request.GET.get("q"))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.request.GET.get("q", "")
+        return context
\ No newline at end of file
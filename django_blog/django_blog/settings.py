@@ -86,6 +86,24 @@ DATABASES = {
 "PORT"
 
 
+# Cache
+# Holds the versioned page and fragment caches (blog.cache). Point
+# REDIS_URL at a Redis-protocol server; otherwise each process gets its
+# own locmem cache.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# A version bump in locmem only reaches the process that made it, so
+# pages and fragments are only cached there for a single process.
+BLOG_CACHE_ALLOW_LOCAL_CACHE = DEBUG
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,132 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+
+from .tokens import InvalidToken, user_from_claims, verify_access
+
+
+class TokenCache:
+    """
+    In-process LRU of token key -> (user, token), each entry dropped
+    after TOKEN_AUTH_CACHE_TTL seconds.
+
+    Invalidation (accounts.signals) only reaches this process; other
+    workers notice a logout, rotated token or deactivated user when
+    their entry expires, so keep the TTL short.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        return getattr(settings, "TOKEN_AUTH_CACHE_SIZE", 10000)
+
+    @property
+    def ttl(self):
+        return getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user, token = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return user, token
+
+    def set(self, key, user, token):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._drop(key)
+
+    def invalidate_user_on_commit(self, user_id):
+        transaction.on_commit(lambda: self.invalidate_user(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1].pk]
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that answers repeat requests from token_cache
+    instead of the Token + user join.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+            cached = user, token
+        user, token = cached
+        # Each request gets its own copy, so nothing a view sets on
+        # request.user leaks into other requests.
+        return copy.copy(user), token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    "Authorization: Bearer <access>" with an access token from
+    accounts.tokens. Verification is a signature check plus one cache
+    read for the revocation list; request.auth is the token's claims.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+        try:
+            claims = verify_access(auth[1].decode())
+        except (InvalidToken, UnicodeError):
+            raise exceptions.AuthenticationFailed(_("Invalid or expired token."))
+        return user_from_claims(claims), claims
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+
+from .hashing import hash_pool
+
+User = get_user_model()
+
+
+class PooledHashingBackend(ModelBackend):
+    """
+    ModelBackend that runs the password hash on accounts.hashing's
+    bounded pool. The user lookup and any hash upgrade stay on the
+    request thread (and its database connection). Raises HashPoolFull
+    when the pool is saturated.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords.
+            hash_pool.run(make_password, password)
+            return None
+
+        outdated = []
+        if not hash_pool.run(check_password, password, user.password, outdated.append):
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+        if outdated:
+            user.set_password(password)
+            user.save(update_fields=["password"])
+        return user
@@ -0,0 +1,19 @@
+from social_media_api.cache import VersionedCache
+
+from .serializers import UserSerializer
+
+user_cache = VersionedCache("user")
+
+
+def serialize_user(user, request):
+    """Serialized user, cached per site root since profile_picture is an absolute URL."""
+
+    def load(missing):
+        # A user from a signed access token has most fields deferred;
+        # fetch them together rather than one query per field.
+        deferred = user.get_deferred_fields()
+        if deferred:
+            user.refresh_from_db(fields=deferred)
+        return {user.pk: UserSerializer(user, context={"request": request}).data}
+
+    return user_cache.fetch([user.pk], load, variant=request.build_absolute_uri("/"))[0]
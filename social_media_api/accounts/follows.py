@@ -0,0 +1,52 @@
+from .models import CustomUser
+
+Follow = CustomUser.following.through
+
+
+def _resolve(user, target_ids):
+    """Split target_ids into (existing ids other than user, unknown ids, skipped ids)."""
+    target_ids = set(target_ids)
+    skipped = {user.pk} & target_ids
+    target_ids -= skipped
+    found = set(CustomUser.objects.filter(pk__in=target_ids).values_list("id", flat=True))
+    return found, target_ids - found, skipped
+
+
+def bulk_follow(user, target_ids):
+    """
+    Follow every user in target_ids with one INSERT on the follow table.
+
+    Goes through the related manager, which skips rows that already
+    exist and sends a single m2m_changed for the batch, so follower
+    counts, timelines and caches stay in step.
+    """
+    found, unknown, skipped = _resolve(user, target_ids)
+    already = set(
+        Follow.objects.filter(from_customuser=user, to_customuser_id__in=found)
+        .values_list("to_customuser_id", flat=True)
+    )
+    new = found - already
+    if new:
+        user.following.add(*new)
+    return {
+        "followed": sorted(new),
+        "already_following": sorted(already),
+        "unknown": sorted(unknown),
+        "skipped": sorted(skipped),
+    }
+
+
+def bulk_unfollow(user, target_ids):
+    found, unknown, skipped = _resolve(user, target_ids)
+    following = set(
+        Follow.objects.filter(from_customuser=user, to_customuser_id__in=found)
+        .values_list("to_customuser_id", flat=True)
+    )
+    if following:
+        user.following.remove(*following)
+    return {
+        "unfollowed": sorted(following),
+        "not_following": sorted(found - following),
+        "unknown": sorted(unknown),
+        "skipped": sorted(skipped),
+    }
@@ -0,0 +1,59 @@
+from collections import Counter
+
+from social_media_api.cache import VersionedCache
+
+from .models import CustomUser
+
+Follow = CustomUser.following.through
+
+# Adjacency sets of the follow graph: user id -> frozenset of ids that
+# user follows. Follower sets are not cached: a popular account's would
+# be huge and be dropped on every new follower. "Does a follow b" is
+# answered as b in following_of(a) instead.
+following_cache = VersionedCache("following")
+
+
+def _adjacency(cache, key_fk, value_fk, user_ids):
+    def load(missing):
+        adjacency = {pk: set() for pk in missing}
+        rows = Follow.objects.filter(**{f"{key_fk}__in": missing}).values_list(key_fk, value_fk)
+        for user_id, other_id in rows.iterator():
+            adjacency[user_id].add(other_id)
+        return {pk: frozenset(ids) for pk, ids in adjacency.items()}
+
+    user_ids = list(user_ids)
+    return dict(zip(user_ids, cache.fetch(user_ids, load)))
+
+
+def following_of(*user_ids):
+    """{user_id: frozenset of ids that user follows}"""
+    return _adjacency(following_cache, "from_customuser_id", "to_customuser_id", user_ids)
+
+
+def suggested_user_ids(user, limit=20):
+    """
+    Friends-of-friends ranking: users followed by the people `user`
+    follows, scored by how many of them follow each candidate.
+    Returns [(user_id, mutual_count)], best first.
+    """
+    following = following_of(user.pk)[user.pk]
+    scores = Counter()
+    for second_degree in following_of(*following).values():
+        scores.update(second_degree)
+    for excluded in following | {user.pk}:
+        scores.pop(excluded, None)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def followers_among(user_ids, user_id):
+    """The subset of user_ids that follow user_id."""
+    return {pk for pk, following in following_of(*user_ids).items() if user_id in following}
+
+
+def mutual_follower_ids(viewer, user_id):
+    """People viewer follows who also follow user_id."""
+    return sorted(followers_among(following_of(viewer.pk)[viewer.pk], user_id))
+
+
+def invalidate_follows(from_ids):
+    following_cache.invalidate_on_commit(*from_ids)
@@ -0,0 +1,77 @@
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+def pool_size():
+    return getattr(settings, "LOGIN_HASH_WORKERS", 4)
+
+
+def queue_size():
+    return getattr(settings, "LOGIN_HASH_QUEUE", 16)
+
+
+def queue_wait():
+    return getattr(settings, "LOGIN_HASH_WAIT", 0.25)
+
+
+class HashPoolFull(Exception):
+    """Every hashing slot is busy; the login should be retried later."""
+
+
+class HashPool:
+    """
+    Bounded pool for password hashing.
+
+    At most LOGIN_HASH_WORKERS hashes run at once and LOGIN_HASH_QUEUE
+    more may wait. A caller that cannot get a slot within
+    LOGIN_HASH_WAIT seconds gets HashPoolFull instead of joining an
+    ever-growing queue, so a burst of bad logins is shed at the door
+    rather than holding every web worker. hashlib releases the GIL
+    while hashing, so threads run the work in parallel.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                self._slots = threading.BoundedSemaphore(pool_size() + queue_size())
+                self._executor = ThreadPoolExecutor(max_workers=pool_size(), thread_name_prefix="login-hash")
+                atexit.register(self.shutdown)
+        return self._executor, self._slots
+
+    def run(self, fn, *args):
+        """fn(*args) on a pool thread; blocks until it returns."""
+        executor, slots = self._start()
+        if not slots.acquire(timeout=queue_wait()):
+            raise HashPoolFull
+        try:
+            future = executor.submit(self._call, slots, fn, args)
+        except BaseException:
+            slots.release()
+            raise
+        return future.result()
+
+    @staticmethod
+    def _call(slots, fn, args):
+        # Free the slot before the result is handed back, so the caller
+        # never sees its own slot still taken.
+        try:
+            return fn(*args)
+        finally:
+            slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hash_pool = HashPool()
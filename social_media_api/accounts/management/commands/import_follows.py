@@ -0,0 +1,67 @@
+import csv
+import sys
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.follows import bulk_follow, bulk_unfollow
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a follow graph from a CSV of follower_id,followee_id rows ('-' reads stdin). "
+        "Rows are applied per follower in set-based batches; unknown ids are reported, not fatal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file of follower_id,followee_id rows, or '-' for stdin.")
+        parser.add_argument("--unfollow", action="store_true", help="Remove the listed follows instead.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Maximum followees applied per statement.",
+        )
+
+    def handle(self, *args, **options):
+        apply = bulk_unfollow if options["unfollow"] else bulk_follow
+        changed_key = "unfollowed" if options["unfollow"] else "followed"
+        chunk_size = options["chunk_size"]
+        totals = {"changed": 0, "unknown": set(), "unknown_followers": set()}
+
+        stream = sys.stdin if options["path"] == "-" else open(options["path"], newline="")
+        try:
+            # Consecutive rows for the same follower are applied together;
+            # files sorted by follower give one batch per follower.
+            for follower_id, rows in groupby(self.read_edges(stream), key=lambda edge: edge[0]):
+                followee_ids = [followee for _, followee in rows]
+                follower = CustomUser.objects.filter(pk=follower_id).first()
+                if follower is None:
+                    totals["unknown_followers"].add(follower_id)
+                    continue
+                for start in range(0, len(followee_ids), chunk_size):
+                    result = apply(follower, followee_ids[start:start + chunk_size])
+                    totals["changed"] += len(result[changed_key])
+                    totals["unknown"].update(result["unknown"])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(f"{changed_key.capitalize()}: {totals['changed']}")
+        if totals["unknown_followers"]:
+            self.stdout.write(f"Unknown follower ids: {sorted(totals['unknown_followers'])}")
+        if totals["unknown"]:
+            self.stdout.write(f"Unknown followee ids: {sorted(totals['unknown'])}")
+
+    def read_edges(self, stream):
+        for line_number, row in enumerate(csv.reader(stream), start=1):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                follower_id, followee_id = (int(value) for value in row[:2])
+            except ValueError:
+                if line_number == 1:
+                    continue  # header row
+                raise CommandError(f"Line {line_number}: expected follower_id,followee_id, got {row!r}")
+            yield follower_id, followee_id
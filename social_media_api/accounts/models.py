@@ -12,5 +12,9 @@ class CustomUser(AbstractUser):
         blank=True,
     )
 
+    # Denormalized counters, kept in sync by accounts.signals.
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.username
\ No newline at end of file
@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 from rest_framework.authtoken.models import Token
+from .hashing import HashPoolFull
+from .graph import followers_among
+from .throttling import client_ip, ip_limit, username_limit
 
 User = get_user_model()
 
@@ -11,18 +14,37 @@ class FollowResponseSerializer(serializers.Serializer):
     following_count = serializers.IntegerField()
     following = serializers.BooleanField()
 
+class BulkFollowSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+
 class UserSerializer(serializers.ModelSerializer):
-    followers_count = serializers.IntegerField(source="followers.count", read_only=True)
-    following_count = serializers.IntegerField(source="following.count", read_only=True)
+    follows_you = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
             "id", "username", "email", "first_name", "last_name",
             "bio", "profile_picture", "followers_count", "following_count",
+            "follows_you",
         ]
         read_only_fields = ["followers_count", "following_count"]
 
+    def get_follows_you(self, obj):
+        """Whether obj follows the requesting user."""
+        request = self.context.get("request")
+        viewer = getattr(request, "user", None)
+        if viewer is None or not viewer.is_authenticated:
+            return False
+        # Checked against each row's cached following set, fetched once for
+        # every row of a list serialization; never the viewer's follower set.
+        checked, follows = self.context.setdefault("follows_viewer", (set(), set()))
+        if obj.pk not in checked:
+            many = isinstance(self.parent, serializers.ListSerializer) and self.parent.instance is not None
+            ids = [row.pk for row in self.parent.instance] if many else [obj.pk]
+            checked.update(ids)
+            follows.update(followers_among(ids, viewer.pk))
+        return obj.pk in follows
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -46,8 +68,25 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, attrs):
-        user = authenticate(username=attrs["username"], password=attrs["password"])
+        # Throttled attempts are turned away before any hashing is done.
+        request = self.context.get("request")
+        wait = username_limit.consume(attrs["username"].lower())
+        if request is not None:
+            wait = max(wait, ip_limit.consume(client_ip(request)))
+        if wait:
+            raise exceptions.Throttled(wait=wait)
+        try:
+            user = authenticate(request, username=attrs["username"], password=attrs["password"])
+        except HashPoolFull:
+            raise exceptions.Throttled(wait=1, detail="Too many logins in progress, try again shortly.")
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
         attrs["user"] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
@@ -0,0 +1,108 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import user_cache
+from .tokens import revoke_user
+from .graph import invalidate_follows
+from .models import CustomUser
+
+Follow = CustomUser.following.through
+
+
+def _bump(user_ids, field, delta):
+    CustomUser.objects.filter(pk__in=user_ids).update(**{field: F(field) + delta})
+
+
+def _invalidate(instance, other_ids, reverse):
+    user_cache.invalidate_on_commit(instance.pk, *other_ids)
+    invalidate_follows(other_ids if reverse else [instance.pk])
+
+
+@receiver(m2m_changed, sender=Follow)
+def update_follow_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep followers_count/following_count and the cached follow graph
+    in step with the follow table.
+
+    post_add only reports rows that were actually inserted, but remove
+    and clear report what was asked for, so decrements are computed
+    from the rows that still exist in pre_remove/pre_clear (inside the
+    same transaction as the DELETE).
+    """
+    # Field counted on `instance`, and on the users at the other end.
+    own_field, other_field = (
+        ("followers_count", "following_count") if reverse else ("following_count", "followers_count")
+    )
+    own_fk, other_fk = (
+        ("to_customuser_id", "from_customuser_id") if reverse else ("from_customuser_id", "to_customuser_id")
+    )
+
+    if action == "post_add" and pk_set:
+        _bump([instance.pk], own_field, len(pk_set))
+        _bump(pk_set, other_field, 1)
+        _invalidate(instance, pk_set, reverse)
+    elif action in ("pre_remove", "pre_clear"):
+        rows = Follow.objects.filter(**{own_fk: instance.pk})
+        if action == "pre_remove":
+            if not pk_set:
+                return
+            rows = rows.filter(**{f"{other_fk}__in": pk_set})
+        other_ids = list(rows.values_list(other_fk, flat=True))
+        if other_ids:
+            _bump([instance.pk], own_field, -len(other_ids))
+            _bump(other_ids, other_field, -1)
+            _invalidate(instance, other_ids, reverse)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    # Logout, and the delete half of a rotation.
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_cached_tokens(sender, instance, **kwargs):
+    # A new token or any change to the user (e.g. is_active) retires
+    # cached logins; the user object in them would be stale.
+    user_id = instance.user_id if sender is Token else instance.pk
+    token_cache.invalidate_user(user_id)
+    token_cache.invalidate_user_on_commit(user_id)
+
+
+# Signed access tokens are never checked against the database, so a
+# deactivated or deleted user, or one whose is_staff/is_superuser claims
+# changed, has to be put on the revocation list.
+PRIVILEGE_FIELDS = ("is_staff", "is_superuser")
+
+
+@receiver(pre_save, sender=CustomUser)
+def note_privilege_change(sender, instance, update_fields=None, **kwargs):
+    instance._privileges_changed = False
+    if instance._state.adding or (update_fields is not None and not set(PRIVILEGE_FIELDS) & set(update_fields)):
+        return
+    saved = CustomUser.objects.filter(pk=instance.pk).values_list(*PRIVILEGE_FIELDS).first()
+    instance._privileges_changed = saved is not None and saved != tuple(
+        getattr(instance, field) for field in PRIVILEGE_FIELDS
+    )
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_deactivated_user_tokens(sender, instance, **kwargs):
+    if not instance.is_active or instance._privileges_changed:
+        revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_user(instance.pk)
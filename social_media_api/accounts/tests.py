@@ -1,3 +1,377 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from posts.models import Post, TimelineEntry
+
+from .authentication import token_cache
+from .follows import bulk_follow
+from .hashing import HashPool, HashPoolFull, hash_pool
+from .throttling import username_limit
+from .tokens import issue_tokens
+
+User = get_user_model()
+
+
+class ProfileCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="me", password="pass12345")
+        self.other = User.objects.create_user(username="other", password="pass12345")
+        self.client.force_authenticate(user=self.user)
+
+    def test_follow_invalidates_cached_profile(self):
+        self.assertEqual(self.client.get(reverse("profile")).data["followers_count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.following.add(self.user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.client.get(reverse("profile")).data["followers_count"], 1)
+
+
+class BulkFollowTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="me", password="pass12345")
+        # Fixture users don't log in; skip hashing a password for each.
+        self.others = User.objects.bulk_create(
+            [User(username=f"u{i}", password=make_password(None)) for i in range(4)]
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_follow_reports_unknown_ids(self):
+        self.user.following.add(self.others[0])
+        ids = [u.pk for u in self.others] + [self.user.pk, 9999]
+        response = self.client.post(reverse("bulk-follow"), {"user_ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["followed"], sorted(u.pk for u in self.others[1:]))
+        self.assertEqual(response.data["already_following"], [self.others[0].pk])
+        self.assertEqual(response.data["unknown"], [9999])
+        self.assertEqual(response.data["skipped"], [self.user.pk])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 4)
+
+    def test_bulk_follow_costs_the_same_at_any_size(self):
+        authors = User.objects.bulk_create([User(username=f"a{i}", password=make_password(None)) for i in range(50)])
+        for author in authors[:3]:
+            Post.objects.create(author=author, title=f"by {author.username}")
+        with self.assertNumQueries(8):
+            bulk_follow(self.user, [u.pk for u in authors])
+        self.assertEqual(TimelineEntry.objects.filter(user=self.user).count(), 3)
+
+    def test_bulk_unfollow(self):
+        self.user.following.add(*self.others[:2])
+        ids = [self.others[0].pk, self.others[3].pk]
+        response = self.client.post(reverse("bulk-unfollow"), {"user_ids": ids}, format="json")
+        self.assertEqual(response.data["unfollowed"], [self.others[0].pk])
+        self.assertEqual(response.data["not_following"], [self.others[3].pk])
+        self.assertEqual(list(self.user.following.all()), [self.others[1]])
+
+    def test_import_follows_command(self):
+        rows = ["follower_id,followee_id"]
+        rows += [f"{self.user.pk},{u.pk}" for u in self.others] + [f"{self.user.pk},9999", "8888,1"]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("\n".join(rows))
+        try:
+            out = StringIO()
+            call_command("import_follows", f.name, "--chunk-size=3", stdout=out)
+        finally:
+            os.unlink(f.name)
+        self.assertIn("Followed: 4", out.getvalue())
+        self.assertIn("Unknown follower ids: [8888]", out.getvalue())
+        self.assertIn("Unknown followee ids: [9999]", out.getvalue())
+        self.assertEqual(self.user.following.count(), 4)
+
+
+class FollowGraphTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.me = User.objects.create_user(username="me", password="pass12345")
+        self.a, self.b, self.c, self.d = (
+            User.objects.create_user(username=name, password="pass12345") for name in "abcd"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.me.following.add(self.a, self.b)
+            self.a.following.add(self.c, self.d, self.me)
+            self.b.following.add(self.c)
+        self.client.force_authenticate(user=self.me)
+
+    def test_suggestions_rank_friends_of_friends(self):
+        response = self.client.get(reverse("follow-suggestions"))
+        self.assertEqual(
+            [(row["username"], row["mutual_count"]) for row in response.data],
+            [("c", 2), ("d", 1)],
+        )
+
+    def test_suggestions_follow_graph_changes(self):
+        self.client.get(reverse("follow-suggestions"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.me.following.add(self.c)
+        response = self.client.get(reverse("follow-suggestions"))
+        self.assertEqual([row["username"] for row in response.data], ["d"])
+
+    def test_mutual_followers_and_follows_you(self):
+        response = self.client.get(reverse("mutual-followers", args=[self.c.pk]))
+        self.assertEqual([row["username"] for row in response.data], ["a", "b"])
+        self.assertEqual([row["follows_you"] for row in response.data], [True, False])
+
+    def test_graph_reads_are_cached(self):
+        self.client.get(reverse("follow-suggestions"))
+        with self.assertNumQueries(1):  # the in_bulk user fetch; follows_you is read from following sets
+            self.client.get(reverse("follow-suggestions"))
+
+    def test_mutual_followers_are_read_from_following_sets(self):
+        self.client.get(reverse("mutual-followers", args=[self.c.pk]))
+        with self.assertNumQueries(2):  # the target user, then the mutual followers
+            self.client.get(reverse("mutual-followers", args=[self.c.pk]))
+
+    def test_follows_you_is_checked_per_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.d.following.add(self.me)
+        response = self.client.get(reverse("follow-suggestions"))
+        self.assertEqual(
+            [(row["username"], row["follows_you"]) for row in response.data],
+            [("c", False), ("d", True)],
+        )
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = User.objects.create_user(username="me", password="pass12345")
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_repeat_requests_skip_token_lookup(self):
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["username"], "me")
+
+    def test_logout_revokes_token(self):
+        self.client.get(reverse("profile"))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("logout"))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_drops_old_key(self):
+        self.client.get(reverse("profile"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+            Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse("profile"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_AUTH_CACHE_SIZE=1)
+    def test_least_recently_used_entry_is_evicted(self):
+        other = User.objects.create_user(username="other", password="pass12345")
+        other_token = Token.objects.create(user=other)
+        self.client.get(reverse("profile"))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {other_token.key}")
+        self.client.get(reverse("profile"))
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.get(other_token.key))
+
+
+@override_settings(SIGNED_TOKENS_ALLOW_LOCAL_CACHE=True)
+class SignedTokenTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="me", password="pass12345")
+
+    def login(self):
+        response = self.client.post(reverse("login"), {"username": "me", "password": "pass12345"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def bearer(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_access_token_authenticates_without_queries(self):
+        self.bearer(self.login()["access"])
+        self.assertEqual(self.client.get(reverse("profile")).data["username"], "me")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_register_returns_token_pair(self):
+        response = self.client.post(
+            reverse("register"), {"username": "new", "password": "pass12345"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.bearer(response.data["access"])
+        self.assertEqual(self.client.get(reverse("profile")).data["username"], "new")
+
+    def test_profile_update_keeps_other_fields(self):
+        User.objects.filter(pk=self.user.pk).update(email="me@example.com")
+        self.bearer(self.login()["access"])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse("profile"), {"bio": "hello"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.bio, self.user.email), ("hello", "me@example.com"))
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired_access_token_is_rejected(self):
+        self.bearer(issue_tokens(self.user)["access"])
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tampered_token_is_rejected(self):
+        self.bearer(self.login()["access"][:-2] + "xx")
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rotates_and_is_single_use(self):
+        refresh = self.login()["refresh"]
+        response = self.client.post(reverse("token-refresh"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.bearer(response.data["access"])
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+        again = self.client.post(reverse("token-refresh"), {"refresh": refresh})
+        self.assertEqual(again.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_access_and_refresh(self):
+        tokens = self.login()
+        self.bearer(tokens["access"])
+        response = self.client.post(reverse("logout"), {"refresh": tokens["refresh"]})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        refreshed = self.client.post(reverse("token-refresh"), {"refresh": tokens["refresh"]})
+        self.assertEqual(refreshed.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_rejects_a_malformed_body(self):
+        tokens = self.login()
+        self.bearer(tokens["access"])
+        response = self.client.post(reverse("logout"), [tokens["refresh"]], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+
+    def test_privilege_change_revokes_issued_tokens(self):
+        self.user.is_staff = True
+        self.user.save()
+        tokens = self.login()
+        self.user.is_staff = False
+        self.user.save()
+        self.bearer(tokens["access"])
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_edit_keeps_tokens(self):
+        self.bearer(self.login()["access"])
+        self.client.patch(reverse("profile"), {"bio": "hello"})
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+
+    def test_per_process_cache_disables_signed_tokens(self):
+        access = self.login()["access"]
+        with self.settings(SIGNED_TOKENS_ALLOW_LOCAL_CACHE=False):
+            data = self.login()
+            self.assertIn("token", data)
+            self.assertNotIn("access", data)
+            self.bearer(access)
+            self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes_issued_tokens(self):
+        tokens = self.login()
+        self.user.is_active = False
+        self.user.save()
+        self.bearer(tokens["access"])
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        refreshed = self.client.post(reverse("token-refresh"), {"refresh": tokens["refresh"]})
+        self.assertEqual(refreshed.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(LOGIN_THROTTLE_RATES={"username": "3/min", "ip": "5/min"})
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="me", password="pass12345")
+
+    def login(self, username="me", password="pass12345", ip="10.0.0.1"):
+        return self.client.post(
+            reverse("login"), {"username": username, "password": password}, REMOTE_ADDR=ip
+        )
+
+    def test_username_limit_stops_guessing(self):
+        for _ in range(3):
+            self.assertEqual(self.login(password="wrong").status_code, status.HTTP_400_BAD_REQUEST)
+        with mock.patch.object(hash_pool, "run") as run:
+            response = self.login(ip="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        run.assert_not_called()
+
+    def test_ip_limit_spans_usernames(self):
+        for n in range(5):
+            self.login(username=f"guess{n}", password="wrong")
+        self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(ip="10.0.0.2").status_code, status.HTTP_200_OK)
+
+    def test_spoofed_forwarded_for_shares_the_ip_limit(self):
+        for n in range(5):
+            self.client.post(
+                reverse("login"), {"username": f"guess{n}", "password": "wrong"},
+                REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=f"192.0.2.{n}",
+            )
+        response = self.client.post(
+            reverse("login"), {"username": "me", "password": "pass12345"},
+            REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="192.0.2.99",
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_parallel_attempts_cannot_overspend(self):
+        results, start = [], threading.Barrier(20)
+
+        def attempt():
+            start.wait(5)
+            results.append(username_limit.consume("parallel"))
+
+        threads = [threading.Thread(target=attempt) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results.count(0), 3)
+
+    def test_saturated_hash_pool_answers_429(self):
+        with mock.patch.object(hash_pool, "run", side_effect=HashPoolFull):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0, LOGIN_HASH_WAIT=0)
+    def test_hash_pool_sheds_work_beyond_its_bound(self):
+        pool = HashPool()
+        self.addCleanup(pool.shutdown)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=pool.run, args=(block,))
+        worker.start()
+        started.wait(5)
+        with self.assertRaises(HashPoolFull):
+            pool.run(len, "x")
+        release.set()
+        worker.join(5)
+        self.assertEqual(pool.run(len, "x"), 1)
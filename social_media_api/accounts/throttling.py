@@ -0,0 +1,74 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """"10/min" -> (10, 60), in the format of DRF's throttle rates."""
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+def client_ip(request):
+    """
+    The address to throttle request by. X-Forwarded-For is only trusted
+    when REST_FRAMEWORK["NUM_PROXIES"] says how many proxies set it;
+    otherwise a client could send a new value with every attempt.
+    """
+    if api_settings.NUM_PROXIES is None:
+        return request.META.get("REMOTE_ADDR", "")
+    return BaseThrottle().get_ident(request)
+
+
+class SlidingWindowLimit:
+    """
+    Attempts per key under a "num/period" rate, counted in the cache so
+    every process shares them.
+
+    Each attempt is one atomic cache.incr on the current fixed window,
+    so parallel attempts cannot all read the same count. The previous
+    window's count is weighted by how much of it the sliding period
+    still covers, which smooths the double burst a plain fixed window
+    allows across its edge.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+
+    @property
+    def rate(self):
+        return parse_rate(getattr(settings, "LOGIN_THROTTLE_RATES", {})[self.scope])
+
+    def cache_key(self, ident, window):
+        # ident may be any submitted username; hash it into a safe key.
+        return f"accounts:attempts:{self.scope}:{hashlib.md5(ident.encode()).hexdigest()}:{window}"
+
+    def _incr(self, key, period):
+        cache.add(key, 0, timeout=2 * period)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add and incr.
+            cache.add(key, 1, timeout=2 * period)
+            return 1
+
+    def consume(self, ident):
+        """Count an attempt for ident. Returns 0 if allowed, else seconds to wait."""
+        limit, period = self.rate
+        now = time.time()
+        window, elapsed = divmod(now, period)
+        count = self._incr(self.cache_key(ident, int(window)), period)
+        previous = cache.get(self.cache_key(ident, int(window) - 1), 0)
+        if previous * (period - elapsed) / period + count <= limit:
+            return 0
+        return period - elapsed
+
+
+username_limit = SlidingWindowLimit("username")
+ip_limit = SlidingWindowLimit("ip")
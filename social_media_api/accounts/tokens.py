@@ -0,0 +1,147 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router
+
+User = get_user_model()
+
+ACCESS_SALT = "accounts.tokens.access"
+REFRESH_SALT = "accounts.tokens.refresh"
+
+# Carried in every access token so a request's user can be built
+# without touching the database; see user_from_claims.
+CLAIM_FIELDS = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def access_lifetime():
+    return getattr(settings, "ACCESS_TOKEN_LIFETIME", 5 * 60)
+
+
+def refresh_lifetime():
+    return getattr(settings, "REFRESH_TOKEN_LIFETIME", 14 * 24 * 60 * 60)
+
+
+def signed_tokens_enabled():
+    """
+    The revocation list and single-use refresh tokens live in the
+    default cache. With a per-process cache (locmem) a revoked token
+    would keep working on every other worker, so signed tokens are only
+    issued or accepted with a shared cache, or with locmem when
+    SIGNED_TOKENS_ALLOW_LOCAL_CACHE says the app runs as one process.
+    """
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if isinstance(backend, DummyCache):
+        return False
+    if isinstance(backend, LocMemCache):
+        return getattr(settings, "SIGNED_TOKENS_ALLOW_LOCAL_CACHE", False)
+    return True
+
+
+def _jti_key(jti):
+    return f"accounts:revoked:{jti}"
+
+
+def _user_key(user_id):
+    return f"accounts:revoked-before:{user_id}"
+
+
+def _sign(user, salt, **claims):
+    claims.update(uid=user.pk, jti=uuid.uuid4().hex, iat=int(time.time()))
+    return signing.dumps(claims, salt=salt, compress=True)
+
+
+def issue_tokens(user):
+    """
+    A new access/refresh pair for user, as returned by login; empty when
+    signed tokens are disabled (see signed_tokens_enabled).
+    """
+    if not signed_tokens_enabled():
+        return {}
+    return {
+        "access": _sign(user, ACCESS_SALT, usr=[user.username, user.is_staff, user.is_superuser]),
+        "refresh": _sign(user, REFRESH_SALT),
+        "expires_in": access_lifetime(),
+    }
+
+
+def _load(token, salt, max_age):
+    if not signed_tokens_enabled():
+        raise InvalidToken
+    try:
+        claims = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.BadSignature:
+        raise InvalidToken
+    keys = [_jti_key(claims["jti"]), _user_key(claims["uid"])]
+    revoked = cache.get_many(keys)
+    if keys[0] in revoked or revoked.get(keys[1], -1) >= claims["iat"]:
+        raise InvalidToken
+    return claims
+
+
+def verify_access(token):
+    """Claims of a valid access token: signature, age and revocation list only."""
+    return _load(token, ACCESS_SALT, access_lifetime())
+
+
+def verify_refresh(token):
+    return _load(token, REFRESH_SALT, refresh_lifetime())
+
+
+def user_from_claims(claims):
+    """
+    The token's user as a partially loaded instance; any field outside
+    CLAIM_FIELDS is fetched on first access, and save() writes only the
+    fields that were loaded or set.
+    """
+    username, is_staff, is_superuser = claims["usr"]
+    values = dict(zip(CLAIM_FIELDS, (claims["uid"], username, True, is_staff, is_superuser)))
+    # from_db wants the values in model field order.
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(router.db_for_read(User), names, [values[name] for name in names])
+
+
+def _revoke(claims, lifetime):
+    """Add one token to the revocation list until it would expire anyway. False if already there."""
+    remaining = max(claims["iat"] + lifetime - int(time.time()), 1)
+    return cache.add(_jti_key(claims["jti"]), True, timeout=remaining)
+
+
+def revoke_access(claims):
+    _revoke(claims, access_lifetime())
+
+
+def revoke_refresh(token):
+    """Revoke a refresh token if it is still valid; bad tokens are ignored."""
+    try:
+        _revoke(verify_refresh(token), refresh_lifetime())
+    except InvalidToken:
+        pass
+
+
+def revoke_user(user_id):
+    """Revoke every token issued to user_id so far."""
+    cache.set(_user_key(user_id), int(time.time()), timeout=refresh_lifetime())
+
+
+def rotate(token):
+    """
+    Exchange a refresh token for a new pair. The old one is revoked, so
+    each refresh token works once; the user is re-read so deactivation
+    and changed claims take effect.
+    """
+    claims = verify_refresh(token)
+    user = User.objects.filter(pk=claims["uid"], is_active=True).first()
+    # cache.add makes concurrent refreshes with one token race to a single winner.
+    if user is None or not _revoke(claims, refresh_lifetime()):
+        raise InvalidToken
+    return issue_tokens(user)
@@ -1,12 +1,22 @@
 from django.urls import path
-from .views import RegisterView, LoginView, ProfileView, FollowUserView, UnfollowUserView
+from .views import RegisterView, LoginView, LogoutView, TokenRefreshView, ProfileView, FollowUserView, UnfollowUserView
+from .views import BulkFollowView, BulkUnfollowView
+from .views import SuggestionsView, MutualFollowersView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
+    path("logout/", LogoutView.as_view(), name="logout"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
     path("profile/", ProfileView.as_view(), name="profile"),
 
     # follow/unfollow
     path("follow/<int:user_id>/", FollowUserView.as_view(), name="follow-user"),
     path("unfollow/<int:user_id>/", UnfollowUserView.as_view(), name="unfollow-user"),
+    path("follow/bulk/", BulkFollowView.as_view(), name="bulk-follow"),
+    path("unfollow/bulk/", BulkUnfollowView.as_view(), name="bulk-unfollow"),
+
+    # follow graph
+    path("suggestions/", SuggestionsView.as_view(), name="follow-suggestions"),
+    path("users/<int:user_id>/mutual-followers/", MutualFollowersView.as_view(), name="mutual-followers"),
 ]
\ No newline at end of file
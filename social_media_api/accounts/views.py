@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from rest_framework import generics, permissions, status
+from rest_framework import exceptions, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
@@ -7,8 +7,12 @@ from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from .models import CustomUser
 
-from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
-from .serializers import FollowResponseSerializer
+from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, TokenRefreshSerializer, LogoutSerializer
+from .serializers import FollowResponseSerializer, BulkFollowSerializer
+from .follows import bulk_follow, bulk_unfollow
+from .cache import serialize_user
+from .graph import suggested_user_ids, mutual_follower_ids
+from .tokens import InvalidToken, issue_tokens, revoke_access, revoke_refresh, rotate
 
 User = get_user_model()
 
@@ -36,6 +40,58 @@ class UnfollowUserView(generics.GenericAPIView):
         request.user.following.remove(target_user)
         return Response({"detail": f"You unfollowed {target_user.username}."}, status=status.HTTP_200_OK)
 
+class BulkFollowView(generics.GenericAPIView):
+    """
+    Follow many users at once: {"user_ids": [...]}.
+    Unknown ids are reported back instead of failing the request.
+    """
+    serializer_class = BulkFollowSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_follow(request.user, serializer.validated_data["user_ids"])
+        return Response(result, status=status.HTTP_200_OK)
+
+class BulkUnfollowView(generics.GenericAPIView):
+    serializer_class = BulkFollowSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_unfollow(request.user, serializer.validated_data["user_ids"])
+        return Response(result, status=status.HTTP_200_OK)
+
+class SuggestionsView(APIView):
+    """
+    "People you may know": users followed by the people you follow,
+    ranked by how many of them do. ?limit= caps the list (default 20).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+        except ValueError:
+            limit = 20
+        ranked = suggested_user_ids(request.user, limit=limit)
+        users = User.objects.in_bulk([user_id for user_id, _ in ranked])
+        ranked = [(users[user_id], score) for user_id, score in ranked if user_id in users]
+        rows = UserSerializer([user for user, _ in ranked], many=True, context={"request": request}).data
+        data = [{**row, "mutual_count": score} for row, (_, score) in zip(rows, ranked)]
+        return Response(data)
+
+class MutualFollowersView(APIView):
+    """People you follow who also follow user_id."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id):
+        get_object_or_404(CustomUser, id=user_id)
+        users = User.objects.filter(pk__in=mutual_follower_ids(request.user, user_id)).order_by("id")
+        return Response(UserSerializer(users, many=True, context={"request": request}).data)
+
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
@@ -49,6 +105,7 @@ class RegisterView(generics.CreateAPIView):
         data = {
             "user": UserSerializer(user, context={"request": request}).data,
             "token": token.key,
+            **issue_tokens(user),
         }
         return Response(data, status=status.HTTP_201_CREATED)
 
@@ -57,19 +114,56 @@ class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        serializer = LoginSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
         token, _ = Token.objects.get_or_create(user=user)
         return Response({
             "token": token.key,
+            **issue_tokens(user),
             "user": UserSerializer(user, context={"request": request}).data
         })
 
 
+class TokenRefreshView(APIView):
+    """Trade a refresh token for a new access/refresh pair; the old refresh token stops working."""
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = TokenRefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            tokens = rotate(serializer.validated_data["refresh"])
+        except InvalidToken:
+            raise exceptions.AuthenticationFailed("Invalid or expired refresh token.")
+        return Response(tokens)
+
+
+class LogoutView(APIView):
+    """
+    Revoke the token the request was made with. A signed access token
+    can also send {"refresh": ...} to revoke its refresh token.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        elif isinstance(request.auth, dict):
+            revoke_access(request.auth)
+            if "refresh" in serializer.validated_data:
+                revoke_refresh(serializer.validated_data["refresh"])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialize_user(request.user, request))
\ No newline at end of file
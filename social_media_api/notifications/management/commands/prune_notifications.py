@@ -0,0 +1,105 @@
+import gzip
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from notifications.models import Notification
+
+ARCHIVE_FIELDS = [
+    "id", "recipient_id", "actor_id", "verb", "others_count",
+    "target_content_type__app_label", "target_content_type__model",
+    "target_object_id", "timestamp", "is_read",
+]
+DUPLICATE_KEY = ["recipient", "actor", "verb", "target_content_type", "target_object_id"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications older than a cutoff in bounded batches, optionally "
+        "archiving them to gzipped JSONL, and compact duplicate read notifications."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90),
+            help="Prune read notifications older than this many days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--archive",
+            metavar="PATH",
+            help="Append pruned rows to this .jsonl.gz file before deleting them.",
+        )
+        parser.add_argument(
+            "--no-compact",
+            action="store_true",
+            help="Skip collapsing duplicate actor/verb/target rows.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Count rows without changing anything.")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.dry_run = options["dry_run"]
+
+        compacted = 0 if options["no_compact"] else self.compact()
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        expired = Notification.objects.filter(is_read=True, timestamp__lt=cutoff)
+        pruned = self.prune(expired, options["archive"])
+
+        verb = "Would remove" if self.dry_run else "Removed"
+        self.stdout.write(f"{verb} {compacted} duplicate and {pruned} expired notifications.")
+
+    def compact(self):
+        """Keep only the newest read row for each recipient/actor/verb/target."""
+        duplicates = (
+            Notification.objects.filter(is_read=True)
+            .order_by()
+            .values(*DUPLICATE_KEY)
+            .annotate(n=Count("id"), keep_id=Max("id"))
+            .filter(n__gt=1)
+        )
+        removed = 0
+        for group in duplicates.iterator():
+            keep_id, n = group.pop("keep_id"), group.pop("n")
+            if self.dry_run:
+                removed += n - 1
+                continue
+            stale = Notification.objects.filter(is_read=True, **group).exclude(id=keep_id)
+            removed += self.delete_in_batches(stale)
+        return removed
+
+    def prune(self, queryset, archive_path):
+        if self.dry_run:
+            return queryset.count()
+        if not archive_path:
+            return self.delete_in_batches(queryset)
+
+        removed = 0
+        with gzip.open(archive_path, "at", encoding="utf-8") as archive:
+            while True:
+                with transaction.atomic():
+                    rows = list(queryset.order_by("id").values(*ARCHIVE_FIELDS)[:self.batch_size])
+                    if not rows:
+                        break
+                    for row in rows:
+                        archive.write(json.dumps(row, default=str) + "\n")
+                    archive.flush()
+                    Notification.objects.filter(id__in=[row["id"] for row in rows]).delete()
+                removed += len(rows)
+        return removed
+
+    def delete_in_batches(self, queryset):
+        removed = 0
+        while True:
+            ids = list(queryset.order_by("id").values_list("id", flat=True)[:self.batch_size])
+            if not ids:
+                return removed
+            # delete() also counts the cascaded NotificationActor rows.
+            removed += Notification.objects.filter(id__in=ids).delete()[1].get(Notification._meta.label, 0)
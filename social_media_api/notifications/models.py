@@ -16,6 +16,8 @@ class Notification(models.Model):
         related_name="notifications_from"
     )
     verb = models.CharField(max_length=255)  # e.g. "liked your post"
+    # Further actors folded into this row by notifications.queue.
+    others_count = models.PositiveIntegerField(default=0)
     target_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
     target_object_id = models.PositiveIntegerField(null=True, blank=True)
     target = GenericForeignKey("target_content_type", "target_object_id")
@@ -24,6 +26,28 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["recipient", "timestamp", "id"], name="notif_recipient_ts_id_idx"),
+            models.Index(fields=["recipient", "is_read", "timestamp"], name="notif_recipient_unread_idx"),
+            models.Index(fields=["is_read", "timestamp"], name="notif_retention_idx"),
+        ]
 
     def __str__(self):
+        if self.others_count:
+            others = "other" if self.others_count == 1 else "others"
+            return f"{self.actor} and {self.others_count} {others} {self.verb} {self.target}"
         return f"{self.actor} {self.verb} {self.target}"
+
+
+class NotificationActor(models.Model):
+    """
+    One row per distinct actor folded into a coalesced notification, so
+    an actor who repeats an action is not counted again in others_count.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name="actor_links")
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["notification", "actor"], name="unique_notification_actor"),
+        ]
@@ -0,0 +1,199 @@
+import atexit
+import logging
+import threading
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification, NotificationActor
+from .unread import unread_cache
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationEvent(NamedTuple):
+    recipient_id: int
+    actor_id: int
+    verb: str
+    target_content_type_id: Optional[int]
+    target_object_id: Optional[int]
+
+    def coalesce_key(self):
+        return (self.recipient_id, self.verb, self.target_content_type_id, self.target_object_id)
+
+
+def batch_size():
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 500)
+
+
+def flush_interval():
+    """Seconds between background flushes, or None to only flush on demand."""
+    return getattr(settings, "NOTIFICATION_FLUSH_INTERVAL", 1.0)
+
+
+def write_notifications(events):
+    """
+    Persist a batch of events, coalescing repeats of the same
+    (recipient, verb, target) into one row: "A and 12 others ...".
+
+    An unread notification for the same key absorbs new actors instead
+    of getting a sibling row; everything else is bulk-inserted. Each
+    row's distinct actors are kept in NotificationActor, so an actor
+    coming back (e.g. unlike and like again) is not counted twice.
+    """
+    groups = {}
+    for event in events:
+        groups.setdefault(event.coalesce_key(), []).append(event.actor_id)
+
+    keys = list(groups)
+    for start in range(0, len(keys), batch_size()):
+        chunk = keys[start:start + batch_size()]
+        with transaction.atomic():
+            _write_chunk({key: groups[key] for key in chunk})
+
+
+def _write_chunk(groups):
+    match = Q()
+    for recipient_id, verb, content_type_id, object_id in groups:
+        match |= Q(
+            recipient_id=recipient_id,
+            verb=verb,
+            target_content_type_id=content_type_id,
+            target_object_id=object_id,
+        )
+    existing = {
+        (n.recipient_id, n.verb, n.target_content_type_id, n.target_object_id): n
+        for n in Notification.objects.select_for_update().filter(match, is_read=False)
+    }
+
+    seen = set(
+        NotificationActor.objects.filter(notification__in=list(existing.values()))
+        .values_list("notification_id", "actor_id")
+    )
+
+    now = timezone.now()
+    to_update, to_create, links = [], [], []
+    for key, actor_ids in groups.items():
+        actor_ids = list(dict.fromkeys(actor_ids))
+        notification = existing.get(key)
+        if notification is None:
+            recipient_id, verb, content_type_id, object_id = key
+            to_create.append((Notification(
+                recipient_id=recipient_id,
+                actor_id=actor_ids[-1],
+                verb=verb,
+                target_content_type_id=content_type_id,
+                target_object_id=object_id,
+                others_count=len(actor_ids) - 1,
+            ), actor_ids))
+            continue
+        # Rows written in bulk elsewhere (generate/import) only know
+        # their current actor, so count it as seen as well.
+        known = {a for pk, a in seen if pk == notification.pk} | {notification.actor_id}
+        new_actors = [a for a in actor_ids if a not in known]
+        notification.others_count += len(new_actors)
+        notification.actor_id = actor_ids[-1]
+        notification.timestamp = now
+        to_update.append(notification)
+        links += [
+            NotificationActor(notification=notification, actor_id=a)
+            for a in known.union(new_actors) if (notification.pk, a) not in seen
+        ]
+
+    if to_update:
+        Notification.objects.bulk_update(to_update, ["actor", "others_count", "timestamp"])
+    if to_create:
+        created = Notification.objects.bulk_create([notification for notification, _ in to_create])
+        links += [
+            NotificationActor(notification=notification, actor_id=a)
+            for notification, (_, actor_ids) in zip(created, to_create)
+            for a in actor_ids
+        ]
+        unread_cache.invalidate_on_commit(*{n.recipient_id for n in created})
+    if links:
+        NotificationActor.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class NotificationQueue:
+    """
+    In-process queue of pending notifications.
+
+    Requests only append to a list; a daemon thread writes the backlog
+    every NOTIFICATION_FLUSH_INTERVAL seconds, or sooner once
+    NOTIFICATION_BATCH_SIZE events are waiting. Anything still queued
+    is flushed at interpreter exit.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, event):
+        with self._lock:
+            self._events.append(event)
+            full = len(self._events) >= batch_size()
+        interval = flush_interval()
+        if interval is None:
+            return
+        self._ensure_worker(interval)
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of events written."""
+        with self._lock:
+            events, self._events = self._events, []
+        if events:
+            write_notifications(events)
+        return len(events)
+
+    def discard(self):
+        """Drop everything queued without writing it. Returns the number of events dropped."""
+        with self._lock:
+            events, self._events = self._events, []
+        return len(events)
+
+    def _ensure_worker(self, interval):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            if self._worker is None:
+                atexit.register(self.flush)
+            self._worker = threading.Thread(
+                target=self._run, args=(interval,), name="notification-flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self, interval):
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write queued notifications")
+            finally:
+                close_old_connections()
+
+
+queue = NotificationQueue()
+
+
+def notify(recipient, actor, verb, target=None):
+    """Queue a notification for recipient; it is written by the next flush."""
+    content_type_id = object_id = None
+    if target is not None:
+        content_type_id = ContentType.objects.get_for_model(target).pk
+        object_id = target.pk
+    queue.put(NotificationEvent(recipient.pk, actor.pk, verb, content_type_id, object_id))
@@ -1,11 +1,28 @@
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from rest_framework import serializers
 from .models import Notification
+from posts.models import Comment, Post
+from social_media_api.query_plan import QueryPlanSerializerMixin
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(QueryPlanSerializerMixin, serializers.ModelSerializer):
     actor = serializers.StringRelatedField()
     target = serializers.StringRelatedField()
 
+    select_related = ("actor",)
+    # Targets are fetched in one query per content type; their __str__
+    # reads the author, so pull that in alongside.
+    prefetch_related = (
+        GenericPrefetch("target", [
+            Post.objects.select_related("author"),
+            Comment.objects.select_related("author"),
+        ]),
+    )
+
     class Meta:
         model = Notification
-        fields = ["id", "actor", "verb", "target", "timestamp", "is_read"]
\ No newline at end of file
+        fields = ["id", "actor", "others_count", "verb", "target", "timestamp", "is_read"]
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
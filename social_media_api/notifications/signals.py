@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .unread import unread_cache
+
+
+@receiver(post_save, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    unread_cache.invalidate_on_commit(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count_on_delete(sender, instance, **kwargs):
+    # Pruning read rows leaves the unread count alone.
+    if not instance.is_read:
+        unread_cache.invalidate_on_commit(instance.recipient_id)
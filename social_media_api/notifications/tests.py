@@ -1,3 +1,205 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from posts.counters import like_counts
+from posts.models import Comment, Post
+from .models import Notification, NotificationActor
+from .queue import queue
+from .views import NotificationListView
+
+User = get_user_model()
+
+
+class NotificationListQueryTests(APITestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username="recipient", password="pass12345")
+        post = Post.objects.create(author=self.recipient, title="mine")
+        # Fixture users don't log in; skip hashing a password for each.
+        actors = User.objects.bulk_create(
+            [User(username=f"actor{i}", password=make_password(None)) for i in range(6)]
+        )
+        for actor in actors:
+            comment = Comment.objects.create(post=post, author=actor, content="hi")
+            Notification.objects.create(recipient=self.recipient, actor=actor, verb="liked your post", target=post)
+            Notification.objects.create(recipient=self.recipient, actor=actor, verb="commented", target=comment)
+        self.client.force_authenticate(user=self.recipient)
+
+    def count_queries(self, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("notifications"), {"page_size": page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant_across_page_sizes(self):
+        self.assertEqual(self.count_queries(2), self.count_queries(12))
+
+    def test_stream_sends_every_row_in_chunks(self):
+        expected = list(
+            Notification.objects.filter(recipient=self.recipient).order_by("-timestamp", "-id").values_list("id", flat=True)
+        )
+        with mock.patch.object(NotificationListView, "stream_chunk_size", 5):
+            response = self.client.get(reverse("notifications"), {"stream": "true"})
+            self.assertTrue(response.streaming)
+            body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([n["id"] for n in body["results"]], expected)
+        self.assertTrue(body["results"][0]["target"].startswith("Comment by"))
+
+
+@override_settings(NOTIFICATION_FLUSH_INTERVAL=None, LIKE_COUNT_FLUSH_INTERVAL=None)
+class NotificationQueueTests(APITestCase):
+    def setUp(self):
+        self.addCleanup(like_counts.flush)
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.post = Post.objects.create(author=self.author, title="viral")
+        self.fans = User.objects.bulk_create(
+            [User(username=f"fan{i}", password=make_password(None)) for i in range(13)]
+        )
+
+    def like(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(reverse("like-post", args=[self.post.pk]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_like_queues_instead_of_writing(self):
+        self.like(self.fans[0])
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(queue.flush(), 1)
+        self.assertEqual(Notification.objects.get().actor, self.fans[0])
+
+    def test_burst_is_coalesced_into_one_row(self):
+        for fan in self.fans:
+            self.like(fan)
+        with CaptureQueriesContext(connection) as ctx:
+            queue.flush()
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "notifications_notification"')]
+        self.assertEqual(len(inserts), 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor, self.fans[-1])
+        self.assertEqual(notification.others_count, 12)
+        self.assertEqual(str(notification), f"fan12 and 12 others liked your post {self.post}")
+
+    def test_unread_notification_absorbs_later_batches(self):
+        self.like(self.fans[0])
+        queue.flush()
+        self.like(self.fans[1])
+        queue.flush()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.actor, notification.others_count), (self.fans[1], 1))
+
+        notification.is_read = True
+        notification.save()
+        self.like(self.fans[2])
+        queue.flush()
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_returning_actor_is_not_counted_again(self):
+        self.like(self.fans[0])
+        queue.flush()
+        self.like(self.fans[1])
+        queue.flush()
+        for _ in range(3):
+            self.client.force_authenticate(user=self.fans[0])
+            self.client.post(reverse("toggle-like", args=[self.post.pk]))
+            self.client.post(reverse("toggle-like", args=[self.post.pk]))
+            queue.flush()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.actor, notification.others_count), (self.fans[0], 1))
+
+
+class UnreadAndMarkReadTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="pass12345")
+        self.other = User.objects.create_user(username="other", password="pass12345")
+        self.mine = [
+            Notification.objects.create(recipient=self.user, actor=self.other, verb=f"did {i}")
+            for i in range(3)
+        ]
+        self.theirs = Notification.objects.create(recipient=self.other, actor=self.user, verb="did")
+        self.client.force_authenticate(user=self.user)
+
+    def unread(self):
+        return self.client.get(reverse("notifications-unread-count")).data["unread_count"]
+
+    def test_unread_count_is_cached(self):
+        self.assertEqual(self.unread(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(), 3)
+
+    def test_mark_read_updates_only_own_notifications(self):
+        self.assertEqual(self.unread(), 3)
+        ids = [self.mine[0].pk, self.theirs.pk]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("notifications-mark-read"), {"ids": ids}, format="json")
+        self.assertEqual(response.data["marked_read"], 1)
+        self.assertFalse(Notification.objects.get(pk=self.theirs.pk).is_read)
+        self.assertEqual(self.unread(), 2)
+
+    def test_mark_all_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("notifications-mark-all-read"))
+        self.assertEqual(response.data["marked_read"], 3)
+        self.assertEqual(self.unread(), 0)
+
+    def test_mark_read_requires_ids(self):
+        response = self.client.post(reverse("notifications-mark-read"), {"ids": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PruneNotificationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass12345")
+        self.actor = User.objects.create_user(username="actor", password="pass12345")
+        old = timezone.now() - timedelta(days=120)
+        self.expired = [self.make(f"old {i}", is_read=True, timestamp=old) for i in range(5)]
+        self.unread_old = self.make("old unread", is_read=False, timestamp=old)
+        self.recent = self.make("recent", is_read=True)
+        self.dupes = [self.make("dupe", is_read=True) for _ in range(3)]
+
+    def make(self, verb, is_read, timestamp=None):
+        notification = Notification.objects.create(recipient=self.user, actor=self.actor, verb=verb, is_read=is_read)
+        if timestamp:
+            Notification.objects.filter(pk=notification.pk).update(timestamp=timestamp)
+        return notification
+
+    def test_prunes_archives_and_compacts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "archive.jsonl.gz")
+            call_command("prune_notifications", "--batch-size=2", f"--archive={archive}", stdout=StringIO())
+            with gzip.open(archive, "rt") as f:
+                archived = [json.loads(line) for line in f]
+
+        self.assertEqual(sorted(row["id"] for row in archived), sorted(n.pk for n in self.expired))
+        remaining = set(Notification.objects.values_list("id", flat=True))
+        self.assertEqual(remaining, {self.unread_old.pk, self.recent.pk, self.dupes[-1].pk})
+
+    def test_report_counts_notifications_only(self):
+        for notification in self.dupes:
+            NotificationActor.objects.create(notification=notification, actor=self.actor)
+        out = StringIO()
+        call_command("prune_notifications", stdout=out)
+        self.assertIn("Removed 2 duplicate and 5 expired", out.getvalue())
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command("prune_notifications", "--dry-run", stdout=out)
+        self.assertIn("Would remove 2 duplicate and 5 expired", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 10)
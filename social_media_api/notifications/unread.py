@@ -0,0 +1,17 @@
+from social_media_api.cache import VersionedCache
+
+from .models import Notification
+
+unread_cache = VersionedCache("unread")
+
+
+def unread_count(user):
+    """
+    Number of unread notifications for user. Served from the cache;
+    a miss is one COUNT over the (recipient, is_read, timestamp) index.
+    """
+
+    def load(missing):
+        return {user.pk: Notification.objects.filter(recipient=user, is_read=False).count()}
+
+    return unread_cache.fetch([user.pk], load)[0]
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import NotificationListView
+from .views import NotificationListView, UnreadCountView, MarkReadView, MarkAllReadView
 
 urlpatterns = [
     path("", NotificationListView.as_view(), name="notifications"),
+    path("unread-count/", UnreadCountView.as_view(), name="notifications-unread-count"),
+    path("mark-read/", MarkReadView.as_view(), name="notifications-mark-read"),
+    path("mark-all-read/", MarkAllReadView.as_view(), name="notifications-mark-all-read"),
 ]
\ No newline at end of file
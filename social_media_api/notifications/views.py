@@ -1,15 +1,62 @@
 from rest_framework import generics
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, MarkReadSerializer
+from .unread import unread_cache, unread_count
+from social_media_api.pagination import KeysetPagination
+from social_media_api.query_plan import QueryPlanViewMixin
+from social_media_api.streaming import StreamingListMixin
 
 
-class NotificationListView(generics.GenericAPIView):
+class NotificationPagination(KeysetPagination):
+    ordering = ("-timestamp", "-id")
+
+
+class NotificationListView(StreamingListMixin, QueryPlanViewMixin, generics.GenericAPIView):
+    """Newest first, a keyset page at a time; ?stream=true sends them all."""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+
+    def get_queryset(self):
+        return self.apply_query_plan(Notification.objects.filter(recipient=self.request.user))
 
     def get(self, request):
-        notifications = Notification.objects.filter(recipient=request.user)
+        if self.wants_stream():
+            return self.stream_response(self.get_queryset())
+        notifications = self.paginate_queryset(self.get_queryset())
         serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return self.get_paginated_response(serializer.data)
+
+
+class UnreadCountView(APIView):
+    """Badge count for polling clients; no notification rows are sent."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": unread_count(request.user)})
+
+
+class MarkAllReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        updated = Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        unread_cache.invalidate_on_commit(request.user.pk)
+        return Response({"marked_read": updated})
+
+
+class MarkReadView(APIView):
+    """Mark the given notification ids read with a single UPDATE."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = Notification.objects.filter(
+            recipient=request.user, is_read=False, id__in=serializer.validated_data["ids"]
+        ).update(is_read=True)
+        unread_cache.invalidate_on_commit(request.user.pk)
+        return Response({"marked_read": updated})
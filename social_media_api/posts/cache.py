@@ -0,0 +1,35 @@
+from social_media_api.cache import VersionedCache
+
+from .counters import like_counts
+from .likes import liked_post_ids
+from .models import Post
+from .serializers import PostSerializer
+
+post_cache = VersionedCache("post")
+
+
+def serialize_posts(post_ids, context):
+    """
+    Serialized posts for post_ids, in order, served from post_cache where
+    possible. Cached bodies are shared by every viewer and hold persisted
+    counts, so liked_by_me (one lookup for the whole list) and pending
+    likes are filled in afterwards.
+    """
+    post_ids = list(post_ids)
+    shared_context = {**context, "request": None, "liked_post_ids": set(), "persisted_counts": True}
+
+    def load(missing):
+        posts = PostSerializer.apply_query_plan(Post.objects.filter(pk__in=missing))
+        return {post.pk: PostSerializer(post, context=shared_context).data for post in posts}
+
+    posts = post_cache.fetch(post_ids, load)
+    request = context.get("request")
+    liked = liked_post_ids(getattr(request, "user", None), post_ids)
+    return [
+        {
+            **post,
+            "likes_count": max(post["likes_count"] + like_counts.pending(post["id"]), 0),
+            "liked_by_me": post["id"] in liked,
+        }
+        for post in posts
+    ]
@@ -0,0 +1,106 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Like, Post
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def flush_interval():
+    """Seconds between background flushes, or None to only flush on demand."""
+    return getattr(settings, "LIKE_COUNT_FLUSH_INTERVAL", 1.0)
+
+
+def recount_likes(post_ids):
+    """Set likes_count to the number of Like rows for post_ids, one UPDATE per batch of posts."""
+    from .cache import post_cache  # posts.cache imports the serializers, which import this module
+
+    likes = Like.objects.filter(post=OuterRef("pk")).order_by().values("post").annotate(n=Count("pk")).values("n")
+    post_ids = list(post_ids)
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        chunk = post_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            Post.objects.filter(pk__in=chunk).update(likes_count=Coalesce(Subquery(likes), 0))
+            post_cache.invalidate_on_commit(*chunk)
+
+
+class LikeCounter:
+    """
+    Write-behind refresh of Post.likes_count.
+
+    Like rows are written at once, but the like endpoints only note the
+    post as changed; a daemon thread recounts the changed posts every
+    LIKE_COUNT_FLUSH_INTERVAL seconds, so a burst of likes on one post
+    costs one UPDATE of its row instead of one per like. The recount is
+    idempotent, so it can run alongside reconcile_counters, and a lost
+    flush only leaves drift for the next reconcile to repair.
+
+    The +/-1 changes since the last flush are kept as well, so pending()
+    lets reads add what is not yet written. Anything still pending is
+    flushed at interpreter exit.
+    """
+
+    def __init__(self):
+        self._deltas = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def add(self, post_id, delta):
+        with self._lock:
+            self._deltas[post_id] = self._deltas.get(post_id, 0) + delta
+        interval = flush_interval()
+        if interval is not None:
+            self._ensure_worker(interval)
+
+    def pending(self, post_id):
+        return self._deltas.get(post_id, 0)
+
+    def flush(self):
+        """Recount every changed post. Returns the number of posts updated."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        if not deltas:
+            return 0
+        try:
+            recount_likes(deltas)
+        except Exception:
+            # Put them back so the next flush retries.
+            with self._lock:
+                for post_id, delta in deltas.items():
+                    self._deltas[post_id] = self._deltas.get(post_id, 0) + delta
+            raise
+        return len(deltas)
+
+    def _ensure_worker(self, interval):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            if self._worker is None:
+                atexit.register(self.flush)
+            self._worker = threading.Thread(
+                target=self._run, args=(interval,), name="like-counter-flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self, interval):
+        stopped = threading.Event()
+        while not stopped.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write pending like counts")
+            finally:
+                close_old_connections()
+
+
+like_counts = LikeCounter()
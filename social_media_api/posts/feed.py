@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Post, TimelineEntry
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+
+def fanout_max_followers():
+    """
+    Authors with more followers than this are not fanned out on write;
+    their posts are pulled into followers' feeds at read time instead.
+    """
+    return getattr(settings, "FEED_FANOUT_MAX_FOLLOWERS", 5000)
+
+
+def is_pulled_author(author):
+    return author.followers_count > fanout_max_followers()
+
+
+def pulled_authors(user):
+    """Followed authors whose posts are merged into the feed on read."""
+    return user.following.filter(followers_count__gt=fanout_max_followers()).values("id")
+
+
+def fan_out_post(post):
+    """Push a new post into the timeline of every follower of its author."""
+    if is_pulled_author(post.author):
+        return
+    follower_ids = post.author.followers.values_list("id", flat=True)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=follower_id, post=post, created_at=post.created_at)
+            for follower_id in follower_ids.iterator()
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_timeline(follower_ids, author_ids):
+    """
+    Copy the recent posts of author_ids into the timeline of every
+    follower in follower_ids: one ranked query for all authors, then
+    one bulk insert. Pulled authors are left to the read side.
+    """
+    limit = getattr(settings, "FEED_BACKFILL_LIMIT", 200)
+    recent = (
+        Post.objects.filter(author_id__in=author_ids, author__followers_count__lte=fanout_max_followers())
+        .annotate(recency=Window(RowNumber(), partition_by=F("author_id"), order_by=F("created_at").desc()))
+        .filter(recency__lte=limit)
+        .values_list("id", "created_at")
+    )
+    posts = list(recent)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=follower_id, post_id=post_id, created_at=created_at)
+            for follower_id in follower_ids
+            for post_id, created_at in posts
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune_timeline(follower_ids, author_ids):
+    """Drop posts of unfollowed author_ids from the timelines of follower_ids."""
+    TimelineEntry.objects.filter(user_id__in=follower_ids, post__author_id__in=author_ids).delete()
+
+
+def feed_queryset(user):
+    """
+    Posts for user's home feed, newest first, annotated with the
+    (feed_at, feed_id) key FeedPagination pages on.
+
+    Normally that key is the timeline row's own (created_at, post), so
+    a page is a range scan of the (user, created_at, post) index. When
+    user follows authors too popular to fan out on write, their posts
+    are merged in on read and the key falls back to the post's own.
+    """
+    pulled = pulled_authors(user)
+    if pulled.exists():
+        in_timeline = Q(pk__in=TimelineEntry.objects.filter(user=user).values("post_id"))
+        posts = Post.objects.filter(in_timeline | Q(author__in=pulled))
+        posts = posts.annotate(feed_at=F("created_at"), feed_id=F("id"))
+    else:
+        posts = Post.objects.filter(timeline_entries__user=user).annotate(
+            feed_at=F("timeline_entries__created_at"), feed_id=F("timeline_entries__post_id")
+        )
+    return posts.order_by("-feed_at", "-feed_id")
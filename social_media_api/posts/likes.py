@@ -0,0 +1,68 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .counters import like_counts
+from .models import Like, Post
+
+LIKE_TABLE = Like._meta.db_table
+
+
+def liked_post_ids(user, post_ids):
+    """The subset of post_ids that user has liked, in one query."""
+    post_ids = list(post_ids)
+    if not post_ids or user is None or not user.is_authenticated:
+        return set()
+    return set(Like.objects.filter(user=user, post_id__in=post_ids).values_list("post_id", flat=True))
+
+
+def _insert_like(user_id, post_id):
+    # A concurrent double tap hits the unique (user, post) key and is a
+    # no-op instead of an IntegrityError.
+    if connection.vendor == "mysql":
+        sql = f"INSERT IGNORE INTO {LIKE_TABLE} (user_id, post_id, created_at) VALUES (%s, %s, %s)"
+    else:
+        sql = (
+            f"INSERT INTO {LIKE_TABLE} (user_id, post_id, created_at) VALUES (%s, %s, %s) "
+            "ON CONFLICT (user_id, post_id) DO NOTHING"
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, post_id, timezone.now()])
+        return cursor.rowcount == 1
+
+
+def _delete_like(user_id, post_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {LIKE_TABLE} WHERE user_id = %s AND post_id = %s", [user_id, post_id])
+        return cursor.rowcount == 1
+
+
+def set_like(user, post_id, liked=None):
+    """
+    Make user's like on post_id match `liked` (True/False), or flip it
+    when liked is None. Setting the state it already has is a no-op.
+
+    Returns (liked, changed, likes_count, author_id). Raises
+    Post.DoesNotExist if there is no such post.
+
+    Rows are written with plain SQL, so the Like signals do not run;
+    the count change goes to the like_counts write-behind buffer, and
+    the returned likes_count includes whatever is still pending.
+    """
+    with transaction.atomic():
+        row = Post.objects.filter(pk=post_id).values_list("likes_count", "author_id").first()
+        if row is None:
+            raise Post.DoesNotExist
+        if liked is None:
+            changed = _delete_like(user.pk, post_id)
+            liked = not changed
+            if liked:
+                changed = _insert_like(user.pk, post_id)
+        elif liked:
+            changed = _insert_like(user.pk, post_id)
+        else:
+            changed = _delete_like(user.pk, post_id)
+
+    if changed:
+        like_counts.add(post_id, 1 if liked else -1)
+    persisted, author_id = row
+    return liked, changed, max(persisted + like_counts.pending(post_id), 0), author_id
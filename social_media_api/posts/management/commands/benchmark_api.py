@@ -0,0 +1,158 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.queue import queue as notification_queue
+from posts.counters import like_counts
+from posts.models import Post
+
+User = get_user_model()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the feed, post list, like and notification endpoints through the DRF test client "
+        "against the current database, reporting p50/p95/p99 latency and query counts. Run "
+        "generate_social_data first. Results are written as JSON for comparison between commits."
+    )
+
+    ENDPOINTS = ("feed", "post-list", "like-post", "notifications")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per endpoint first.")
+        parser.add_argument("--endpoints", nargs="+", choices=self.ENDPOINTS, default=list(self.ENDPOINTS))
+        parser.add_argument("--prefix", default="synthetic", help="Only act as users with this username prefix.")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--output", metavar="PATH", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline",
+            metavar="PATH",
+            help="Earlier results file; p95 and query count changes against it are printed.",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.user_ids = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}_").values_list("id", flat=True)
+        )
+        self.post_ids = list(Post.objects.values_list("id", flat=True)[:10000])
+        if not self.user_ids or not self.post_ids:
+            raise CommandError("No users or posts to benchmark with; run generate_social_data first.")
+
+        client = APIClient()
+        results = {}
+        # No background flushers: their writes would land inside timed
+        # requests, and the notifications queued by each like would
+        # outlive the unlike that undoes it.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            NOTIFICATION_FLUSH_INTERVAL=None,
+            LIKE_COUNT_FLUSH_INTERVAL=None,
+        ):
+            try:
+                for name in options["endpoints"]:
+                    for _ in range(options["warmup"]):
+                        self.call(client, name)
+                    results[name] = self.measure(client, name, options["iterations"])
+            finally:
+                notification_queue.discard()
+                # Each like was undone, so these deltas net to zero.
+                like_counts.flush()
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "commit": self.git_commit(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "dataset": {"users": User.objects.count(), "posts": Post.objects.count()},
+            "iterations": options["iterations"],
+            "endpoints": results,
+        }
+        baseline = self.load_baseline(options["baseline"])
+        for name, stats in results.items():
+            line = (
+                f"{name:14} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+                f"p99 {stats['p99_ms']:8.2f}ms  queries {stats['queries_mean']:.1f} (max {stats['queries_max']})"
+            )
+            previous = baseline.get(name)
+            if previous:
+                change = (stats["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100 if previous["p95_ms"] else 0
+                line += f"  p95 {change:+.0f}%  queries {stats['queries_mean'] - previous['queries_mean']:+.1f}"
+            self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+    def measure(self, client, name, iterations):
+        latencies, queries, statuses = [], [], {}
+        for _ in range(iterations):
+            latency, query_count, status = self.call(client, name)
+            latencies.append(latency)
+            queries.append(query_count)
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "queries_mean": round(statistics.fmean(queries), 2),
+            "queries_max": max(queries),
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def call(self, client, name):
+        """One timed request as a random user. Returns (ms, queries, status)."""
+        client.force_authenticate(user=User.objects.get(pk=self.rng.choice(self.user_ids)))
+        if name == "like-post":
+            post_id = self.rng.choice(self.post_ids)
+            method, url = client.post, reverse(name, args=[post_id])
+        else:
+            method, url = client.get, reverse(name)
+
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = method(url)
+            latency = (time.perf_counter() - started) * 1000
+
+        if name == "like-post" and response.status_code == 201:
+            # Untimed: remove the like again so repeated runs see the same data.
+            client.post(reverse("unlike-post", args=[post_id]))
+        return latency, len(ctx.captured_queries), response.status_code
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def load_baseline(self, path):
+        if not path:
+            return {}
+        try:
+            with open(path) as stream:
+                return json.load(stream).get("endpoints", {})
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}")
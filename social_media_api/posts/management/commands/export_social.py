@@ -0,0 +1,32 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.transfer import FORMATS, get_datasets, write_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Export users, follows, posts, comments, likes, timelines and notifications (with their "
+        "coalesced actors) to one NDJSON or CSV file per table in a directory, streaming rows in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory to write <table>.<format> files into.")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--only", nargs="+", metavar="TABLE", help="Export just these tables.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        try:
+            datasets = get_datasets(options["only"])
+        except KeyError as exc:
+            raise CommandError(f"Unknown table(s): {exc.args[0]}")
+        fmt = options["format"]
+        os.makedirs(options["directory"], exist_ok=True)
+
+        for dataset in datasets:
+            path = os.path.join(options["directory"], dataset.filename(fmt))
+            with open(path, "w", newline="", encoding="utf-8") as stream:
+                count = write_rows(stream, fmt, dataset.columns, dataset.export_rows(options["chunk_size"]))
+            self.stdout.write(f"{dataset.name}: {count} rows -> {path}")
@@ -0,0 +1,189 @@
+import random
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notifications.models import Notification
+from posts.feed import fanout_max_followers
+from posts.models import Comment, Like, Post, TimelineEntry, path_segment
+
+User = get_user_model()
+Follow = User.following.through
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic social graph for load testing: users whose follower counts follow a "
+        "power law, posts, likes, comments, timelines and notifications, all written with bulk_create "
+        "and with consistent denormalized counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--posts-per-user", type=float, default=5, help="Mean posts per user.")
+        parser.add_argument("--follows-per-user", type=float, default=20, help="Mean accounts each user follows.")
+        parser.add_argument("--likes-per-post", type=float, default=3, help="Mean likes per post.")
+        parser.add_argument("--comments-per-post", type=float, default=1, help="Mean comments per post.")
+        parser.add_argument(
+            "--exponent",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of account popularity; higher concentrates followers on fewer accounts.",
+        )
+        parser.add_argument("--prefix", default="synthetic", help="Username prefix for generated users.")
+        parser.add_argument("--password", default="password", help="Password set on every generated user.")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Users named {prefix}_* already exist; pick another --prefix.")
+
+        with transaction.atomic():
+            users = self.create_users(options["users"], prefix, options["password"])
+            follows = self.create_follows(users, options["follows_per_user"], options["exponent"])
+            posts = self.create_posts(users, options["posts_per_user"])
+            likes = self.create_likes(users, posts, options["likes_per_post"])
+            comments = self.create_comments(users, posts, options["comments_per_post"])
+            self.update_counters(users, follows, posts, likes, comments)
+            timeline = self.create_timeline(users, follows, posts)
+            notifications = self.create_notifications(likes, comments, posts)
+
+        call_command("rebuild_search_index", stdout=self.stdout)
+        self.stdout.write(
+            f"Created {len(users)} users, {len(follows)} follows, {len(posts)} posts, {len(likes)} likes, "
+            f"{len(comments)} comments, {timeline} timeline entries and {notifications} notifications."
+        )
+
+    def count(self, mean):
+        """A non-negative count with the given mean and a long tail."""
+        return int(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+
+    def create_users(self, total, prefix, password):
+        password = make_password(password)
+        width = len(str(total))
+        return User.objects.bulk_create(
+            (User(username=f"{prefix}_{i:0{width}d}", password=password) for i in range(total)),
+            batch_size=self.batch_size,
+        )
+
+    def create_follows(self, users, mean, exponent):
+        # Account i is followed with weight 1 / (i + 1) ** exponent, so a
+        # few accounts collect most followers, like real networks.
+        weights = list(accumulate(1 / (rank + 1) ** exponent for rank in range(len(users))))
+        edges = set()
+        for user in users:
+            wanted = min(self.count(mean) + 1, len(users) - 1)
+            for followee in self.rng.choices(users, cum_weights=weights, k=wanted):
+                if followee.pk != user.pk:
+                    edges.add((user.pk, followee.pk))
+        Follow.objects.bulk_create(
+            (Follow(from_customuser_id=a, to_customuser_id=b) for a, b in edges),
+            batch_size=self.batch_size,
+        )
+        return edges
+
+    def create_posts(self, users, mean):
+        posts = [
+            Post(author_id=user.pk, title=f"Post {n} by {user.username}", content=self.sentence())
+            for user in users
+            for n in range(self.count(mean))
+        ]
+        return Post.objects.bulk_create(posts, batch_size=self.batch_size)
+
+    def create_likes(self, users, posts, mean):
+        likes = []
+        for post in posts:
+            for user in self.rng.sample(users, min(self.count(mean), len(users))):
+                likes.append(Like(user_id=user.pk, post_id=post.pk))
+        return Like.objects.bulk_create(likes, batch_size=self.batch_size)
+
+    def create_comments(self, users, posts, mean):
+        comments = [
+            Comment(post_id=post.pk, author_id=self.rng.choice(users).pk, content=self.sentence())
+            for post in posts
+            for _ in range(self.count(mean))
+        ]
+        comments = Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+        # bulk_create skips the signal that threads comments; all are roots.
+        for comment in comments:
+            comment.path = path_segment(comment.pk)
+        Comment.objects.bulk_update(comments, ["path"], batch_size=self.batch_size)
+        return comments
+
+    def update_counters(self, users, follows, posts, likes, comments):
+        for user in users:
+            user.followers_count = user.following_count = 0
+        by_id = {user.pk: user for user in users}
+        for follower_id, followee_id in follows:
+            by_id[follower_id].following_count += 1
+            by_id[followee_id].followers_count += 1
+        User.objects.bulk_update(users, ["followers_count", "following_count"], batch_size=self.batch_size)
+
+        by_id = {post.pk: post for post in posts}
+        for like in likes:
+            by_id[like.post_id].likes_count += 1
+        for comment in comments:
+            by_id[comment.post_id].comments_count += 1
+        Post.objects.bulk_update(posts, ["likes_count", "comments_count"], batch_size=self.batch_size)
+
+    def create_timeline(self, users, follows, posts):
+        """What fan-out on write would have produced for these follows."""
+        limit = getattr(settings, "FEED_BACKFILL_LIMIT", 200)
+        pushed = {user.pk for user in users if user.followers_count <= fanout_max_followers()}
+        recent = {}
+        for post in reversed(posts):
+            if post.author_id in pushed:
+                recent.setdefault(post.author_id, [])
+                if len(recent[post.author_id]) < limit:
+                    recent[post.author_id].append(post)
+        entries = (
+            TimelineEntry(user_id=follower_id, post_id=post.pk, created_at=post.created_at)
+            for follower_id, followee_id in follows
+            for post in recent.get(followee_id, ())
+        )
+        created = 0
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                created += len(TimelineEntry.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            created += len(TimelineEntry.objects.bulk_create(batch))
+        return created
+
+    def create_notifications(self, likes, comments, posts):
+        authors = {post.pk: post.author_id for post in posts}
+        post_type = ContentType.objects.get_for_model(Post)
+        comment_type = ContentType.objects.get_for_model(Comment)
+        notifications = [
+            Notification(
+                recipient_id=authors[like.post_id], actor_id=like.user_id, verb="liked your post",
+                target_content_type=post_type, target_object_id=like.post_id,
+            )
+            for like in likes
+            if like.user_id != authors[like.post_id]
+        ]
+        notifications += [
+            Notification(
+                recipient_id=authors[comment.post_id], actor_id=comment.author_id, verb="commented on your post",
+                target_content_type=comment_type, target_object_id=comment.pk,
+            )
+            for comment in comments
+            if comment.author_id != authors[comment.post_id]
+        ]
+        return len(Notification.objects.bulk_create(notifications, batch_size=self.batch_size))
+
+    def sentence(self):
+        words = ("django", "python", "feed", "cache", "query", "index", "latency", "graph", "scale", "api")
+        return " ".join(self.rng.choices(words, k=self.rng.randint(5, 20)))
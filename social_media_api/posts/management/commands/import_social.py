@@ -0,0 +1,112 @@
+import os
+from contextlib import ExitStack
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from posts.transfer import FORMATS, explicit_timestamps, get_datasets, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a directory written by export_social with batched bulk_create. Rows keep their ids "
+        "and timestamps, and no model signals run (no fan-out, notifications or counter bumps)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory of <table>.<format> files; missing tables are skipped.")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--only", nargs="+", metavar="TABLE", help="Import just these tables.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Skip rows whose id or unique key already exists instead of failing.",
+        )
+        parser.add_argument(
+            "--fast",
+            action="store_true",
+            help=(
+                "Seeding mode: one transaction per table with foreign key checks off (verified once "
+                "at the end where the database allows it), and exported counters are trusted "
+                "instead of recomputed."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            datasets = get_datasets(options["only"])
+        except KeyError as exc:
+            raise CommandError(f"Unknown table(s): {exc.args[0]}")
+        fmt = options["format"]
+        self.batch_size = options["batch_size"]
+        self.ignore_conflicts = options["ignore_conflicts"]
+        fast = options["fast"]
+
+        loaded = []
+        with ExitStack() as stack:
+            stack.enter_context(explicit_timestamps([dataset.model for dataset in datasets]))
+            checks_disabled = fast and connection.disable_constraint_checking()
+            try:
+                for dataset in datasets:
+                    path = os.path.join(options["directory"], dataset.filename(fmt))
+                    if not os.path.exists(path):
+                        self.stdout.write(f"{dataset.name}: skipped, no {path}")
+                        continue
+                    with open(path, newline="", encoding="utf-8") as stream:
+                        rows = read_rows(stream, fmt)
+                        if fast:
+                            with transaction.atomic():
+                                read, inserted = self.load(dataset, rows)
+                        else:
+                            read, inserted = self.load(dataset, rows, atomic_batches=True)
+                    loaded.append(dataset.model)
+                    line = f"{dataset.name}: {inserted} rows"
+                    if inserted != read:
+                        line += f" ({read - inserted} of {read} skipped as conflicts)"
+                    self.stdout.write(line)
+            finally:
+                if checks_disabled:
+                    connection.enable_constraint_checking()
+            if checks_disabled:
+                connection.check_constraints(table_names=[model._meta.db_table for model in loaded])
+
+        self.reset_sequences(loaded)
+        if not fast:
+            call_command("reconcile_counters", stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+
+    def load(self, dataset, rows, atomic_batches=False):
+        """Returns (rows read, rows inserted)."""
+        manager = dataset.model._default_manager
+        # bulk_create doesn't report which rows ignore_conflicts skipped,
+        # so count the table around the whole load instead.
+        before = manager.count() if self.ignore_conflicts else None
+        count, batch = 0, []
+        for row in rows:
+            batch.append(dataset.build(row))
+            if len(batch) >= self.batch_size:
+                count += self.insert(dataset.model, batch, atomic_batches)
+                batch = []
+        if batch:
+            count += self.insert(dataset.model, batch, atomic_batches)
+        if before is None:
+            return count, count
+        return count, manager.count() - before
+
+    def insert(self, model, objects, atomic):
+        with transaction.atomic() if atomic else ExitStack():
+            model._default_manager.bulk_create(
+                objects, batch_size=self.batch_size, ignore_conflicts=self.ignore_conflicts
+            )
+        return len(objects)
+
+    def reset_sequences(self, model_list):
+        # Rows were inserted with explicit ids; move sequences past them.
+        statements = connection.ops.sequence_reset_sql(no_style(), model_list)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.counters import like_counts
+from posts.models import Comment, Like, Post
+
+User = get_user_model()
+Follow = User.following.through
+
+
+def count_of(model, fk):
+    rows = model.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk)
+    return Coalesce(Subquery(rows.annotate(n=Count("pk")).values("n")), 0)
+
+
+# (model, counter field, rows counted per object)
+COUNTERS = [
+    (Post, "comments_count", lambda: count_of(Comment, "post")),
+    (Post, "likes_count", lambda: count_of(Like, "post")),
+    (User, "followers_count", lambda: count_of(Follow, "to_customuser")),
+    (User, "following_count", lambda: count_of(Follow, "from_customuser")),
+]
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized post and follow counters that have drifted from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted rows without fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dry_run"]:
+            # Recounts are idempotent, so this only stops likes pending in
+            # this process from being reported as drift.
+            like_counts.flush()
+        for model, field, actual in COUNTERS:
+            with transaction.atomic():
+                drifted = (
+                    model.objects.annotate(actual=actual())
+                    .exclude(**{field: F("actual")})
+                    .values_list("pk", flat=True)
+                )
+                drifted_ids = list(drifted)
+                if drifted_ids and not options["dry_run"]:
+                    model.objects.filter(pk__in=drifted_ids).update(**{field: actual()})
+            self.stdout.write(f"{model._meta.label}.{field}: {len(drifted_ids)} drifted")
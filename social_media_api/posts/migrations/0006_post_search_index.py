@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:05
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE posts_post_fts USING fts5(title, content, tokenize='unicode61')",
+    "INSERT INTO posts_post_fts (rowid, title, content) SELECT id, title, content FROM posts_post",
+]
+SQLITE_BACKWARD = ["DROP TABLE IF EXISTS posts_post_fts"]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX posts_post_search_idx ON posts_post USING GIN (("
+    "setweight(to_tsvector('english'::regconfig, COALESCE(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(content, '')), 'B')))",
+]
+POSTGRES_BACKWARD = ["DROP INDEX IF EXISTS posts_post_search_idx"]
+
+
+def run_for_vendor(sqlite, postgres):
+    def run(apps, schema_editor):
+        statements = {"sqlite": sqlite, "postgresql": postgres}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(SQLITE_FORWARD, POSTGRES_FORWARD),
+            run_for_vendor(SQLITE_BACKWARD, POSTGRES_BACKWARD),
+        ),
+    ]
@@ -10,13 +10,56 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized counters, kept in sync by posts.signals.
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="post_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.author})"
 
 
+class PostSearchEntry(models.Model):
+    """
+    A row of the SQLite FTS5 index created by migration 0006, keyed by
+    post id as its rowid. Unmanaged: posts.search writes it with raw SQL,
+    and the model only lets a search join it.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_entry",
+    )
+    title = models.TextField()
+    content = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = "posts_post_fts"
+
+
+# Each path segment is a comment id in fixed-width base36, so sorting by
+# path lists a thread depth-first and a subtree is one range of paths.
+PATH_SEGMENT_WIDTH = 7
+MAX_THREAD_DEPTH = 30
+
+
+def path_segment(pk):
+    digits = ""
+    while pk:
+        pk, digit = divmod(pk, 36)
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"[digit] + digits
+    return digits.rjust(PATH_SEGMENT_WIDTH, "0")
+
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
@@ -24,12 +67,33 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Threading, filled in by posts.signals when the comment is created.
+    parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies")
+    path = models.CharField(max_length=255, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)  # all descendants
+
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comment_created_id_idx"),
+            models.Index(fields=["post", "created_at", "id"], name="comment_post_created_id_idx"),
+            models.Index(fields=["post", "path"], name="comment_post_path_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post_id}"
 
+    @property
+    def ancestor_ids(self):
+        return [int(segment, 36) for segment in self.path.split("/")[:-1]]
+
+    def descendants(self):
+        """Every reply below this comment, in thread order, via one range on (post, path)."""
+        return Comment.objects.filter(
+            post_id=self.post_id, path__gt=f"{self.path}/", path__lt=f"{self.path}0"
+        ).order_by("path")
+
 class Like(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
@@ -47,4 +111,27 @@ class Like(models.Model):
         unique_together = ("user", "post")
 
     def __str__(self):
-        return f"{self.user} liked {self.post}"
\ No newline at end of file
+        return f"{self.user} liked {self.post}"
+
+
+class TimelineEntry(models.Model):
+    """
+    One row per (follower, post): the materialized home timeline.
+    Filled on write by posts.feed.fan_out_post. created_at is copied
+    from the post, so a feed page is a range scan of the
+    (user, created_at, post) index with no sort.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline_entries")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="timeline_entries")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_timeline_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "created_at", "post"], name="timeline_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} in timeline of {self.user_id}"
@@ -0,0 +1,150 @@
+import re
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import PageNumberPagination
+
+from .models import PostSearchEntry
+
+FTS_TABLE = PostSearchEntry._meta.db_table
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query or "")[:16]
+
+
+class SearchBackend(ABC):
+    """
+    Keeps a full-text index of posts and answers ranked queries.
+
+    search() returns `queryset` narrowed to matching posts and ordered
+    best match first.
+    """
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @abstractmethod
+    def search(self, queryset, query):
+        pass
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    FTS5 virtual table keyed by post id (rowid). Every token is matched
+    as a prefix, and bm25 ranks title hits ten times higher than content.
+    """
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (%s, %s, %s)",
+                [post.pk, post.title, post.content],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content) SELECT id, title, content FROM posts_post"
+            )
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        match = " ".join(f'"{token}"*' for token in tokens)
+        # Join the FTS table once, so MATCH runs a single time and bm25
+        # (lower is better) is read off each joined row; a subquery per
+        # row would re-run the match for every hit.
+        return (
+            queryset.filter(search_entry__isnull=False)
+            .filter(RawSQL(f"{FTS_TABLE} MATCH %s", [match], output_field=BooleanField()))
+            .annotate(search_rank=RawSQL(f"bm25({FTS_TABLE}, 10.0, 1.0)", [], output_field=FloatField()))
+            .order_by("search_rank", "-id")
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector search over the expression GIN index created by the
+    migration, so there is nothing to maintain on write.
+    """
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        vector = SearchVector("title", weight="A", config="english") + SearchVector(
+            "content", weight="B", config="english"
+        )
+        search_query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens), search_type="raw", config="english"
+        )
+        return (
+            queryset.annotate(search_vector=vector)
+            .filter(search_vector=search_query)
+            .annotate(search_rank=SearchRank(vector, search_query))
+            .order_by("-search_rank", "-id")
+        )
+
+
+class ContainsSearchBackend(SearchBackend):
+    """Unindexed fallback for other databases: the old icontains scan."""
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        for token in tokens:
+            queryset = queryset.filter(Q(title__icontains=token) | Q(content__icontains=token))
+        return queryset.order_by("-created_at", "-id")
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_backend():
+    path = getattr(settings, "POST_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, ContainsSearchBackend)()
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """?search=<terms>: ranked full-text match on post title and content."""
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return get_backend().search(queryset, query)
+
+
+class SearchPagination(PageNumberPagination):
+    """Pages over rank-ordered search results."""
+    page_size_query_param = "page_size"
+    max_page_size = 100
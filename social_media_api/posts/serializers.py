@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Post, Comment
+from .models import Post, Comment, MAX_THREAD_DEPTH
+from social_media_api.query_plan import QueryPlanSerializerMixin
+from .counters import like_counts
+from .likes import liked_post_ids
 
 User = get_user_model()
 
@@ -10,18 +13,58 @@ class UserMiniSerializer(serializers.ModelSerializer):
         fields = ["id", "username"]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(QueryPlanSerializerMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
+    select_related = ("author",)
 
     class Meta:
         model = Comment
-        fields = ["id", "post", "author", "content", "created_at", "updated_at"]
-        read_only_fields = ["author", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "post",
+            "parent",
+            "author",
+            "content",
+            "depth",
+            "reply_count",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["author", "depth", "reply_count", "created_at", "updated_at"]
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            # A comment stays where it was posted; its path, its replies
+            # and both posts' comments_count depend on it.
+            for field in ("post", "parent"):
+                if field in attrs and attrs[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError({field: "A comment cannot be moved."})
+            return attrs
+        parent = attrs.get("parent")
+        if parent is not None:
+            if parent.post_id != attrs["post"].pk:
+                raise serializers.ValidationError({"parent": "Reply must be on the same post."})
+            if parent.depth + 1 >= MAX_THREAD_DEPTH:
+                raise serializers.ValidationError({"parent": "This thread is nested too deeply."})
+        return attrs
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostListSerializer(serializers.ListSerializer):
+    """Looks up liked_by_me for the whole page in one query."""
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, "all") else data)
+        request = self.context.get("request")
+        self.context["liked_post_ids"] = liked_post_ids(
+            getattr(request, "user", None), [post.pk for post in posts]
+        )
+        return super().to_representation(posts)
+
+
+class PostSerializer(QueryPlanSerializerMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
-    comments_count = serializers.IntegerField(source="comments.count", read_only=True)
+    liked_by_me = serializers.SerializerMethodField()
+    select_related = ("author",)
 
     class Meta:
         model = Post
@@ -33,5 +76,28 @@ class PostSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "comments_count",
+            "likes_count",
+            "liked_by_me",
         ]
-        read_only_fields = ["author", "created_at", "updated_at", "comments_count"]
\ No newline at end of file
+        read_only_fields = ["author", "created_at", "updated_at", "comments_count", "likes_count"]
+        list_serializer_class = PostListSerializer
+
+    def to_representation(self, post):
+        data = super().to_representation(post)
+        if not self.context.get("persisted_counts"):
+            # Likes not yet flushed by the write-behind counter.
+            data["likes_count"] = max(data["likes_count"] + like_counts.pending(post.pk), 0)
+        return data
+
+    def get_liked_by_me(self, post):
+        liked = self.context.get("liked_post_ids")
+        if liked is None:
+            request = self.context.get("request")
+            liked = liked_post_ids(getattr(request, "user", None), [post.pk])
+        return post.pk in liked
+
+
+class LikeToggleSerializer(serializers.Serializer):
+    # Missing or null toggles; the default also covers form posts,
+    # where an absent boolean would otherwise read as false.
+    liked = serializers.BooleanField(required=False, allow_null=True, default=None)
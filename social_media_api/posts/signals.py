@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import post_cache
+from .feed import backfill_timeline, prune_timeline
+from .search import get_backend as get_search_backend
+from .models import Comment, Like, Post, TimelineEntry, path_segment
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.following.through)
+def sync_timeline_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            TimelineEntry.objects.filter(post__author=instance).delete()
+        else:
+            TimelineEntry.objects.filter(user=instance).delete()
+        return
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+
+    # Reverse: instance is the followed author, pk_set are followers.
+    follower_ids, author_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    if action == "post_add":
+        backfill_timeline(follower_ids, author_ids)
+    else:
+        prune_timeline(follower_ids, author_ids)
+
+
+def _bump(post_id, field, delta):
+    Post.objects.filter(pk=post_id).update(**{field: F(field) + delta})
+    post_cache.invalidate_on_commit(post_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_added(sender, instance, created, **kwargs):
+    if created:
+        _bump(instance.post_id, "comments_count", 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_removed(sender, instance, **kwargs):
+    _bump(instance.post_id, "comments_count", -1)
+
+
+@receiver(post_save, sender=Comment)
+def thread_new_comment(sender, instance, created, raw=False, **kwargs):
+    if not created or raw or instance.path:
+        return
+    segment = path_segment(instance.pk)
+    instance.path = f"{instance.parent.path}/{segment}" if instance.parent_id else segment
+    instance.depth = instance.path.count("/")
+    Comment.objects.filter(pk=instance.pk).update(path=instance.path, depth=instance.depth)
+    Comment.objects.filter(pk__in=instance.ancestor_ids).update(reply_count=F("reply_count") + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_reply(sender, instance, **kwargs):
+    # A cascade sends this once per removed descendant, so surviving
+    # ancestors end up decremented by the size of the removed subtree.
+    Comment.objects.filter(pk__in=instance.ancestor_ids).update(reply_count=Greatest(F("reply_count") - 1, 0))
+
+
+@receiver(post_save, sender=Like)
+def count_like_added(sender, instance, created, **kwargs):
+    if created:
+        _bump(instance.post_id, "likes_count", 1)
+
+
+@receiver(post_delete, sender=Like)
+def count_like_removed(sender, instance, **kwargs):
+    _bump(instance.post_id, "likes_count", -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    post_cache.invalidate_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authored_posts(sender, instance, created, update_fields=None, **kwargs):
+    # Cached posts embed the author's username.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    post_cache.invalidate_on_commit(*instance.posts.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
@@ -1,3 +1,586 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from notifications.models import Notification, NotificationActor
+from notifications.queue import queue as notification_queue
+
+from .models import Comment, Like, Post, TimelineEntry
+from .cache import post_cache
+from .counters import like_counts
+from .feed import feed_queryset
+from .likes import set_like
+from .search import get_backend
+from .views import FeedView
+
+User = get_user_model()
+
+
+class FeedTimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader", password="pass12345")
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.stranger = User.objects.create_user(username="stranger", password="pass12345")
+        self.reader.following.add(self.author)
+        self.author.refresh_from_db()
+
+    def create_post(self, user, title):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(reverse("post-list"), {"title": title, "content": "..."})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Post.objects.get(pk=response.data["id"])
+
+    def get_feed_titles(self):
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(reverse("feed"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post["title"] for post in response.data["results"]]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        post = self.create_post(self.author, "hello")
+        self.create_post(self.stranger, "not followed")
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.get_feed_titles(), ["hello"])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        self.create_post(self.stranger, "older post")
+        self.reader.following.add(self.stranger)
+        self.assertEqual(self.get_feed_titles(), ["older post"])
+        self.reader.following.remove(self.stranger)
+        self.assertEqual(self.get_feed_titles(), [])
+
+    def test_feed_pages_are_an_index_range_scan(self):
+        posts = [self.create_post(self.author, f"post {i}") for i in range(5)]
+        Post.objects.filter(pk__in=[p.pk for p in posts[1:4]]).update(created_at=posts[1].created_at)
+        TimelineEntry.objects.filter(post__in=posts[1:4]).update(created_at=posts[1].created_at)
+
+        self.client.force_authenticate(user=self.reader)
+        url, titles = reverse("feed") + "?page_size=2", []
+        while url:
+            response = self.client.get(url)
+            titles += [post["title"] for post in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(titles, ["post 4", "post 3", "post 2", "post 1", "post 0"])
+
+        sql, params = feed_queryset(self.reader).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("timeline_user_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_popular_author_is_merged_on_read(self):
+        with self.settings(FEED_FANOUT_MAX_FOLLOWERS=0):
+            self.create_post(self.author, "celebrity post")
+            self.assertFalse(TimelineEntry.objects.exists())
+            self.assertEqual(self.get_feed_titles(), ["celebrity post"])
+
+
+class StreamingFeedTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader", password="pass12345")
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.reader.following.add(self.author)
+        self.client.force_authenticate(user=self.author)
+        for i in range(7):
+            self.client.post(reverse("post-list"), {"title": f"post {i}", "content": "..."})
+
+    def test_stream_sends_whole_feed_newest_first(self):
+        self.client.force_authenticate(user=self.reader)
+        with mock.patch.object(FeedView, "stream_chunk_size", 3):
+            response = self.client.get(reverse("feed"), {"stream": "1"})
+            self.assertTrue(response.streaming)
+            body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([p["title"] for p in body["results"]], [f"post {i}" for i in reversed(range(7))])
+        self.assertEqual(body["results"][0]["author"]["username"], "author")
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.posts = [
+            Post.objects.create(author=self.author, title=f"post {i}") for i in range(25)
+        ]
+        # Identical timestamps must still page on the id tie-breaker.
+        Post.objects.filter(pk__in=[p.pk for p in self.posts[10:15]]).update(
+            created_at=self.posts[10].created_at
+        )
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(post["id"] for post in response.data["results"])
+            url = response.data[link]
+        return ids, response
+
+    def test_next_links_visit_every_post_once_newest_first(self):
+        ids, last = self.walk(reverse("post-list") + "?page_size=7", "next")
+        expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(last.data["results"]), 4)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(reverse("post-list"))
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse("post-list") + "?cursor=garbage")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="pass12345")
+        self.bob = User.objects.create_user(username="bob", password="pass12345")
+        self.post = Post.objects.create(author=self.alice, title="counted")
+
+    def test_comment_and_like_counters_follow_writes(self):
+        comment = Comment.objects.create(post=self.post, author=self.bob, content="hi")
+        Comment.objects.create(post=self.post, author=self.alice, content="hey")
+        like = Like.objects.create(post=self.post, user=self.bob)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.comments_count, self.post.likes_count), (2, 1))
+
+        comment.delete()
+        like.delete()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.comments_count, self.post.likes_count), (1, 0))
+
+    def test_follow_counters_ignore_duplicate_adds_and_missing_removes(self):
+        self.alice.following.add(self.bob)
+        self.alice.following.add(self.bob)
+        self.bob.followers.remove(self.alice)
+        self.bob.followers.remove(self.alice)
+        self.alice.following.add(self.bob)
+        for user, expected in ((self.alice, (0, 1)), (self.bob, (1, 0))):
+            user.refresh_from_db()
+            self.assertEqual((user.followers_count, user.following_count), expected)
+
+    def test_reconcile_counters_repairs_drift(self):
+        Comment.objects.create(post=self.post, author=self.bob, content="hi")
+        Post.objects.filter(pk=self.post.pk).update(comments_count=7)
+        User.objects.filter(pk=self.bob.pk).update(followers_count=3)
+
+        call_command("reconcile_counters", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(self.bob.followers_count, 0)
+
+
+class QueryPlanTests(APITestCase):
+    """List endpoints must cost the same number of queries at any page size."""
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader", password="pass12345")
+        # Fixture users don't log in; skip hashing a password for each.
+        authors = User.objects.bulk_create(
+            [User(username=f"author{i}", password=make_password(None)) for i in range(12)]
+        )
+        self.reader.following.add(*authors)
+        for i, author in enumerate(authors):
+            post = Post.objects.create(author=author, title=f"post {i}")
+            TimelineEntry.objects.create(user=self.reader, post=post, created_at=post.created_at)
+            Comment.objects.create(post=post, author=author, content="first")
+        self.client.force_authenticate(user=self.reader)
+
+    def count_queries(self, url, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"page_size": page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, url):
+        self.assertEqual(self.count_queries(url, 2), self.count_queries(url, 10))
+
+    def test_post_list(self):
+        self.assert_constant_queries(reverse("post-list"))
+
+    def test_comment_list(self):
+        self.assert_constant_queries(reverse("comment-list"))
+
+    def test_feed(self):
+        self.assert_constant_queries(reverse("feed"))
+
+
+class RepresentationCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.post = Post.objects.create(author=self.author, title="cached")
+        self.url = reverse("post-detail", args=[self.post.pk])
+
+    def test_retrieve_is_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["title"], "cached")
+
+    def test_comment_invalidates_cached_post(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content="hi")
+        self.assertEqual(self.client.get(self.url).data["comments_count"], 1)
+
+    def test_username_change_invalidates_cached_post(self):
+        self.client.get(self.url)
+        self.author.username = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        self.assertEqual(self.client.get(self.url).data["author"]["username"], "renamed")
+
+    def test_missing_post_is_404(self):
+        self.assertEqual(self.client.get(reverse("post-detail", args=[0])).status_code, 404)
+        self.assertEqual(self.client.get("/api/posts/abc/").status_code, 404)
+
+    def test_missing_post_leaves_no_version_key(self):
+        self.assertEqual(self.client.get(reverse("post-detail", args=[999999])).status_code, 404)
+        self.assertIsNone(cache.get(post_cache.version_key(999999)))
+
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.in_title = Post.objects.create(author=self.author, title="Django tips", content="misc")
+        self.in_content = Post.objects.create(author=self.author, title="Misc", content="some django notes")
+        Post.objects.create(author=self.author, title="Flask", content="nothing relevant")
+
+    def search(self, query, **params):
+        response = self.client.get(reverse("post-list"), {"search": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_ranked_prefix_search(self):
+        response = self.search("djan")
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]],
+            [self.in_title.pk, self.in_content.pk],
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        self.in_title.title = "Renamed"
+        self.in_title.content = "unrelated"
+        self.in_title.save()
+        self.in_content.delete()
+        self.assertEqual(self.search("django").data["count"], 0)
+        self.assertEqual(self.search("renamed").data["count"], 1)
+
+    def test_search_is_paginated(self):
+        response = self.search("django", page_size=1)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.assertEqual(self.search('"*)').data["count"], 0)
+
+    def test_fts_match_runs_once(self):
+        queryset = get_backend().search(Post.objects.all(), "django")
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertNotIn("CORRELATED", plan)
+        self.assertEqual(plan.count("posts_post_fts"), 1)
+
+    def test_rebuild_search_index(self):
+        Post.objects.bulk_create([Post(author=self.author, title="bulk django", content="")])
+        self.assertEqual(self.search("bulk").data["count"], 0)
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.search("bulk").data["count"], 1)
+
+
+class CommentThreadTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="pass12345")
+        self.post = Post.objects.create(author=self.user, title="Threads", content="")
+        self.client.force_authenticate(user=self.user)
+
+    def reply(self, content, parent=None, post=None):
+        data = {"post": (post or self.post).pk, "content": content}
+        if parent is not None:
+            data["parent"] = parent.pk
+        return self.client.post(reverse("comment-list"), data)
+
+    def test_replies_are_threaded_and_counted(self):
+        root = Comment.objects.get(pk=self.reply("root").data["id"])
+        child = self.reply("child", parent=root).data
+        self.assertEqual(child["depth"], 1)
+        self.reply("grandchild", parent=Comment.objects.get(pk=child["id"]))
+        self.reply("other root")
+
+        roots = self.client.get(reverse("comment-list"), {"post": self.post.pk, "top_level": "true"}).data
+        self.assertEqual([(c["content"], c["reply_count"]) for c in roots["results"]], [("root", 2), ("other root", 0)])
+        self.assertEqual(self.post.comments.count(), 4)
+
+        replies = self.client.get(reverse("comment-replies", args=[root.pk])).data["results"]
+        self.assertEqual([c["content"] for c in replies], ["child", "grandchild"])
+        shallow = self.client.get(reverse("comment-replies", args=[root.pk]), {"depth": 1}).data["results"]
+        self.assertEqual([c["content"] for c in shallow], ["child"])
+
+    def test_reply_must_stay_on_its_post(self):
+        root = Comment.objects.create(post=self.post, author=self.user, content="root")
+        other = Post.objects.create(author=self.user, title="Other", content="")
+        response = self.reply("stray", parent=root, post=other)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("parent", response.data)
+
+    def test_comment_cannot_be_moved_by_update(self):
+        root = Comment.objects.create(post=self.post, author=self.user, content="root")
+        other = Post.objects.create(author=self.user, title="Other", content="")
+        url = reverse("comment-detail", args=[root.pk])
+        response = self.client.patch(url, {"post": other.pk}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("post", response.data)
+        self.assertEqual(self.client.patch(url, {"post": self.post.pk, "content": "edited"}, format="json").status_code, 200)
+        root.refresh_from_db()
+        self.assertEqual((root.post_id, root.content), (self.post.pk, "edited"))
+
+    def test_load_more_replies_in_constant_queries(self):
+        root = Comment.objects.create(post=self.post, author=self.user, content="root")
+        for i in range(15):
+            Comment.objects.create(post=self.post, author=self.user, content=f"reply {i}", parent=root)
+        url = reverse("comment-replies", args=[root.pk])
+        with self.assertNumQueries(2):  # the comment, then one page of its subtree
+            first = self.client.get(url, {"page_size": 10}).data
+        self.assertEqual(len(first["results"]), 10)
+        second = self.client.get(first["next"]).data
+        self.assertEqual([c["content"] for c in second["results"]], [f"reply {i}" for i in range(10, 15)])
+        self.assertIsNone(second["next"])
+
+
+class ExportImportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="pass12345", bio="hi")
+        self.bob = User.objects.create_user(username="bob", password="pass12345")
+        self.bob.following.add(self.alice)
+        self.post = Post.objects.create(author=self.alice, title="Exported", content="body")
+        root = Comment.objects.create(post=self.post, author=self.bob, content="root")
+        Comment.objects.create(post=self.post, author=self.alice, content="reply", parent=root)
+        Like.objects.create(user=self.bob, post=self.post)
+        notification = Notification.objects.create(
+            recipient=self.alice, actor=self.bob, verb="liked your post", target=self.post
+        )
+        NotificationActor.objects.create(notification=notification, actor=self.bob)
+
+    def snapshot(self):
+        return {
+            "users": list(User.objects.order_by("pk").values_list("username", "bio", "password", "followers_count")),
+            "posts": list(Post.objects.values_list("id", "title", "created_at", "comments_count", "likes_count")),
+            "comments": list(Comment.objects.order_by("pk").values_list("path", "parent_id", "reply_count", "created_at")),
+            "likes": list(Like.objects.values_list("user_id", "post_id")),
+            "follows": list(self.bob.following.values_list("pk", flat=True)),
+            "notifications": [(n.verb, n.target, n.timestamp) for n in Notification.objects.all()],
+            "notification_actors": list(NotificationActor.objects.values_list("notification_id", "actor_id")),
+        }
+
+    def round_trip(self, fmt, *import_args):
+        before = self.snapshot()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("export_social", directory, "--format", fmt, "--chunk-size", "2", stdout=StringIO())
+            self.assertTrue(os.path.exists(os.path.join(directory, f"posts.{fmt}")))
+            Notification.objects.all().delete()
+            User.objects.all().delete()  # cascades to everything else
+            call_command("import_social", directory, "--format", fmt, "--batch-size", "2", *import_args, stdout=StringIO())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_ndjson_round_trip_in_fast_mode(self):
+        self.round_trip("ndjson", "--fast")
+
+    def test_csv_round_trip_recounts(self):
+        self.round_trip("csv")
+        # Loading sends no signals, so nothing was double counted or queued.
+        self.assertEqual(Post.objects.get().comments_count, 2)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_ignore_conflicts_reports_rows_inserted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("export_social", directory, "--only", "users", "posts", stdout=StringIO())
+            Post.objects.all().delete()
+            out = StringIO()
+            call_command("import_social", directory, "--only", "users", "posts", "--ignore-conflicts", stdout=out)
+        self.assertIn("users: 0 rows (2 of 2 skipped as conflicts)", out.getvalue())
+        self.assertIn("posts: 1 rows\n", out.getvalue())
+
+    def test_unknown_table_is_an_error(self):
+        with self.assertRaises(CommandError):
+            call_command("export_social", "/tmp", "--only", "bogus", stdout=StringIO())
+
+
+@override_settings(NOTIFICATION_FLUSH_INTERVAL=None, LIKE_COUNT_FLUSH_INTERVAL=None)
+class SyntheticDataTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(like_counts.flush)
+        call_command(
+            "generate_social_data", "--users", "60", "--follows-per-user", "8", "--seed", "7", stdout=StringIO()
+        )
+
+    def test_generated_graph_is_skewed_and_consistent(self):
+        followers = sorted(User.objects.values_list("followers_count", flat=True), reverse=True)
+        self.assertGreater(followers[0], 4 * max(followers[len(followers) // 2], 1))
+        self.assertTrue(Post.objects.exists())
+        self.assertFalse(Comment.objects.filter(path="").exists())
+
+        out = StringIO()
+        call_command("reconcile_counters", "--dry-run", stdout=out)
+        self.assertNotIn(" 1 drifted", out.getvalue())
+        self.assertEqual(out.getvalue().count(": 0 drifted"), 4)
+
+    def test_benchmark_writes_percentiles(self):
+        likes = Like.objects.count()
+        notifications = Notification.objects.count()
+        likes_total = Post.objects.aggregate(total=Sum("likes_count"))["total"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            call_command("benchmark_api", "--iterations", "5", "--warmup", "1", "--seed", "1", "--output", path, stdout=StringIO())
+            with open(path) as stream:
+                report = json.load(stream)
+        self.assertEqual(set(report["endpoints"]), {"feed", "post-list", "like-post", "notifications"})
+        feed = report["endpoints"]["feed"]
+        self.assertLessEqual(feed["p50_ms"], feed["p99_ms"])
+        self.assertEqual(feed["statuses"], {"200": 5})
+        self.assertEqual(Like.objects.count(), likes)
+        self.assertEqual(len(notification_queue), 0)
+        self.assertEqual(Notification.objects.count(), notifications)
+        self.assertEqual(Post.objects.aggregate(total=Sum("likes_count"))["total"], likes_total)
+
+
+@override_settings(NOTIFICATION_FLUSH_INTERVAL=None, LIKE_COUNT_FLUSH_INTERVAL=None)
+class LikeToggleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(like_counts.flush)
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.fan = User.objects.create_user(username="fan", password="pass12345")
+        self.post = Post.objects.create(author=self.author, title="likeable")
+        self.url = reverse("toggle-like", args=[self.post.pk])
+        self.client.force_authenticate(user=self.fan)
+
+    def test_toggle_flips_and_reports_count(self):
+        with self.assertNumQueries(5):  # savepoint, post lookup, delete, insert, release
+            response = self.client.post(self.url)
+        self.assertEqual(response.data, {"liked": True, "likes_count": 1})
+        self.assertEqual(self.client.post(self.url).data, {"liked": False, "likes_count": 0})
+        self.assertFalse(Like.objects.exists())
+
+    def test_setting_state_is_idempotent(self):
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, {"liked": True}, format="json").data["likes_count"], 1)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(self.client.post(reverse("like-post", args=[self.post.pk])).status_code, 400)
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, {"liked": False}, format="json").data["likes_count"], 0)
+        like_counts.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+    def test_form_and_malformed_bodies(self):
+        self.assertEqual(self.client.post(self.url, {"liked": "true"}).data, {"liked": True, "likes_count": 1})
+        self.assertEqual(self.client.post(self.url, {"liked": "true"}).data, {"liked": True, "likes_count": 1})
+        self.assertEqual(self.client.post(self.url, {"liked": None}, format="json").data["liked"], False)
+        for body in ([True], {"liked": "maybe"}):
+            self.assertEqual(self.client.post(self.url, body, format="json").status_code, 400)
+        self.assertFalse(Like.objects.exists())
+
+    def test_missing_post_is_404_and_leaves_no_like(self):
+        self.assertEqual(self.client.post(reverse("toggle-like", args=[self.post.pk + 100])).status_code, 404)
+        self.assertFalse(Like.objects.exists())
+
+    def test_liked_by_me_is_one_query_per_page(self):
+        other = Post.objects.create(author=self.author, title="other")
+        self.client.post(self.url)
+        self.client.force_authenticate(user=self.fan)
+        with CaptureQueriesContext(connection) as ctx:
+            results = self.client.get(reverse("post-list")).data["results"]
+        self.assertEqual({p["id"]: p["liked_by_me"] for p in results}, {self.post.pk: True, other.pk: False})
+        self.assertEqual(sum("posts_like" in q["sql"] for q in ctx.captured_queries), 1)
+
+        # Cached representations are shared; liked_by_me must not leak.
+        self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.client.force_authenticate(user=self.author)
+        self.assertFalse(self.client.get(reverse("post-detail", args=[self.post.pk])).data["liked_by_me"])
+
+
+@override_settings(NOTIFICATION_FLUSH_INTERVAL=None, LIKE_COUNT_FLUSH_INTERVAL=None)
+class WriteBehindLikeCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(like_counts.flush)
+        self.author = User.objects.create_user(username="author", password="pass12345")
+        self.post = Post.objects.create(author=self.author, title="viral")
+        self.fans = [User.objects.create_user(username=f"fan{i}", password="pass12345") for i in range(5)]
+
+    def like(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse("toggle-like", args=[self.post.pk]))
+
+    def test_likes_touch_post_row_once_per_flush(self):
+        with CaptureQueriesContext(connection) as ctx:
+            for fan in self.fans:
+                self.like(fan)
+        self.assertFalse(any(q["sql"].startswith("UPDATE") for q in ctx.captured_queries))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(like_counts.flush(), 1)
+        self.assertEqual(sum(q["sql"].startswith("UPDATE") for q in ctx.captured_queries), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 5)
+
+    def test_flush_after_reconcile_does_not_count_twice(self):
+        Like.objects.create(user=self.fans[0], post=self.post)
+        set_like(self.fans[1], self.post.pk, True)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("posts.Post.likes_count: 0 drifted", out.getvalue())
+        self.assertEqual(like_counts.pending(self.post.pk), 0)
+        set_like(self.fans[2], self.post.pk, True)
+        # Simulate a reconcile in another process, which can't flush this one's buffer.
+        Post.objects.filter(pk=self.post.pk).update(likes_count=3)
+        like_counts.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 3)
+
+    def test_reads_merge_pending_likes(self):
+        detail = reverse("post-detail", args=[self.post.pk])
+        self.assertEqual(self.client.get(detail).data["likes_count"], 0)  # now cached
+        self.like(self.fans[0])
+        self.like(self.fans[1])
+        self.like(self.fans[1])  # toggled back off
+        self.assertEqual(self.client.get(detail).data["likes_count"], 1)
+        self.assertEqual(self.client.get(reverse("post-list")).data["results"][0]["likes_count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            like_counts.flush()
+        self.assertEqual(self.client.get(detail).data["likes_count"], 1)
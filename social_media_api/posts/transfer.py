@@ -0,0 +1,176 @@
+import csv
+import datetime
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from notifications.models import Notification, NotificationActor
+
+from .models import Comment, Like, Post, TimelineEntry
+
+User = get_user_model()
+
+FORMATS = ("ndjson", "csv")
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds; keep them exact.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class Dataset:
+    """
+    One table moved by export_social / import_social: `fields` are
+    attnames written in order, denormalized counters included, so a
+    load needs no signal or recount to be consistent.
+    """
+
+    def __init__(self, name, model, fields):
+        self.name = name
+        self.model = model
+        self.fields = fields
+
+    @property
+    def columns(self):
+        return self.fields
+
+    def filename(self, fmt):
+        return f"{self.name}.{fmt}"
+
+    def queryset(self):
+        return self.model._default_manager.order_by("pk")
+
+    def export_rows(self, chunk_size):
+        for values in self.queryset().values_list(*self.fields).iterator(chunk_size=chunk_size):
+            yield dict(zip(self.fields, values))
+
+    def build(self, row):
+        values = {}
+        for name in self.fields:
+            field = self.model._meta.get_field(name)
+            value = row.get(name)
+            if value == "" and field.null:
+                value = None
+            values[field.attname] = field.to_python(value)
+        return self.model(**values)
+
+
+class NotificationDataset(Dataset):
+    """Targets are written as "app_label.model" so content type ids need not match."""
+    target_field = "target_content_type"
+
+    def __init__(self):
+        super().__init__("notifications", Notification, [
+            "id", "recipient_id", "actor_id", "verb", "others_count",
+            "target_object_id", "timestamp", "is_read",
+        ])
+        self.content_types = {}
+
+    @property
+    def columns(self):
+        return [*self.fields, self.target_field]
+
+    def export_rows(self, chunk_size):
+        labels = {
+            ct.pk: f"{ct.app_label}.{ct.model}"
+            for ct in ContentType.objects.filter(
+                pk__in=Notification.objects.order_by().values("target_content_type").distinct()
+            )
+        }
+        values = self.queryset().values_list(*self.fields, "target_content_type_id")
+        for *row, content_type_id in values.iterator(chunk_size=chunk_size):
+            yield {**dict(zip(self.fields, row)), self.target_field: labels.get(content_type_id, "")}
+
+    def build(self, row):
+        notification = super().build(row)
+        label = row.get(self.target_field) or ""
+        if label:
+            if label not in self.content_types:
+                app_label, model = label.split(".", 1)
+                self.content_types[label] = ContentType.objects.get_by_natural_key(app_label, model).pk
+            notification.target_content_type_id = self.content_types[label]
+        return notification
+
+
+# In load order: every dataset only references ones before it.
+DATASETS = [
+    Dataset("users", User, [
+        "id", "username", "email", "password", "first_name", "last_name", "bio",
+        "is_active", "is_staff", "is_superuser", "date_joined", "last_login",
+        "followers_count", "following_count",
+    ]),
+    Dataset("follows", User.following.through, ["id", "from_customuser_id", "to_customuser_id"]),
+    Dataset("posts", Post, [
+        "id", "author_id", "title", "content", "created_at", "updated_at", "comments_count", "likes_count",
+    ]),
+    Dataset("comments", Comment, [
+        "id", "post_id", "author_id", "parent_id", "path", "depth", "reply_count",
+        "content", "created_at", "updated_at",
+    ]),
+    Dataset("likes", Like, ["id", "user_id", "post_id", "created_at"]),
+    Dataset("timeline", TimelineEntry, ["id", "user_id", "post_id", "created_at"]),
+    NotificationDataset(),
+    Dataset("notification_actors", NotificationActor, ["id", "notification_id", "actor_id"]),
+]
+
+
+def get_datasets(names=None):
+    if not names:
+        return list(DATASETS)
+    known = {dataset.name: dataset for dataset in DATASETS}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise KeyError(", ".join(unknown))
+    return [dataset for dataset in DATASETS if dataset.name in names]
+
+
+def write_rows(stream, fmt, fields, rows):
+    """Write rows (dicts) to stream as NDJSON or CSV with a header. Returns the row count."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: "" if v is None else v for k, v in row.items()})
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, cls=ExportEncoder, separators=(",", ":")))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def read_rows(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+@contextmanager
+def explicit_timestamps(model_list):
+    """
+    bulk_create runs pre_save, which stamps auto_now / auto_now_add
+    fields; switch that off so imported timestamps are kept.
+    """
+    switched = []
+    for model in model_list:
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+                switched.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in switched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
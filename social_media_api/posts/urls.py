@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import PostViewSet, CommentViewSet, FeedView
-from .views import LikePostView, UnlikePostView
+from .views import LikePostView, LikeToggleView, UnlikePostView
 
 router = DefaultRouter()
 router.register(r"posts", PostViewSet, basename="post")
@@ -11,5 +11,6 @@ urlpatterns = [
     path("", include(router.urls)),
     path("feed/", FeedView.as_view(), name="feed"),
     path("<int:pk>/like/", LikePostView.as_view(), name="like-post"),
+    path("<int:pk>/like/toggle/", LikeToggleView.as_view(), name="toggle-like"),
     path("<int:pk>/unlike/", UnlikePostView.as_view(), name="unlike-post"),
 ]
\ No newline at end of file
@@ -1,109 +1,179 @@
 from django.contrib.auth import get_user_model
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
-from .models import Post, Comment, Like
-from .serializers import PostSerializer, CommentSerializer
+from .models import Post, Comment
+from .serializers import PostSerializer, CommentSerializer, LikeToggleSerializer
+from .feed import fan_out_post, feed_queryset
+from .cache import serialize_posts
+from .likes import set_like
+from .search import FullTextSearchFilter, SearchPagination
 from .permissions import IsOwnerOrReadOnly
 from rest_framework import generics, status
-from notifications.models import Notification
+from notifications.queue import notify
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
+from django.http import Http404
+from social_media_api.pagination import KeysetPagination, OldestFirstKeysetPagination, PathPagination
+from social_media_api.query_plan import QueryPlanViewMixin
+from social_media_api.streaming import StreamingListMixin
 
 User = get_user_model()
 
-class FeedView(generics.ListAPIView):
+class FeedPagination(KeysetPagination):
+    # The timeline key annotated by feed_queryset.
+    ordering = ("-feed_at", "-feed_id")
+
+class FeedView(StreamingListMixin, generics.ListAPIView):
     """
-    Returns a paginated feed of posts by users the current user follows.
+    Returns a paginated feed of posts by users the current user follows,
+    or the whole feed with ?stream=true.
     Requires authentication.
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
 
-    def get(self, request):
-        following_users = request.user.following.all()
-
-        posts = Post.objects.filter(author__in=following_users).order_by("-created_at")
+    def get_queryset(self):
+        return feed_queryset(self.request.user)
 
-        serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data)
+    def serialize_chunk(self, rows):
+        return serialize_posts([post.pk for post in rows], self.get_serializer_context())
 
-class PostViewSet(viewsets.ModelViewSet):
+    def get(self, request):
+        # Only ids come from the feed query; bodies come from the post cache.
+        posts = self.get_queryset().only("id")
+        if self.wants_stream():
+            return self.stream_response(posts)
+        page = self.paginate_queryset(posts)
+        return self.get_paginated_response(self.serialize_chunk(page))
+
+class PostViewSet(QueryPlanViewMixin, viewsets.ModelViewSet):
     """
     CRUD for posts.
     - List & retrieve: public (read-only)
     - Create/Update/Delete: authenticated + owner-only for edits
-    - Search: ?search=<query> matches title or content
-    - Pagination: global PageNumberPagination
+    - Search: ?search=<query> full-text matches title or content (prefix
+      match per word), best match first, paginated with ?page=
+    - Pagination: keyset cursor on (created_at, id), newest first
     """
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["title", "content"]
+    pagination_class = KeysetPagination
+    filter_backends = [FullTextSearchFilter]
+
+    @property
+    def paginator(self):
+        # Search results are ordered by rank, which a cursor on
+        # (created_at, id) cannot page through.
+        if not hasattr(self, "_paginator"):
+            searching = self.request.query_params.get(FullTextSearchFilter.search_param)
+            self._paginator = SearchPagination() if searching else self.pagination_class()
+        return self._paginator
 
     def perform_create(self, serializer):
         if not self.request.user.is_authenticated:
             raise PermissionDenied("Authentication required.")
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        fan_out_post(post)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+        data = serialize_posts([pk], self.get_serializer_context())
+        if not data:
+            raise Http404
+        return Response(data[0])
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(QueryPlanViewMixin, viewsets.ModelViewSet):
     """
     CRUD for comments.
     - List & retrieve: public (read-only)
     - Create/Update/Delete: authenticated + owner-only for edits
     - Filter by post via query param: ?post=<post_id> (basic filter)
+    - ?top_level=true: thread roots only, each with its reply_count
+    - /comments/<id>/replies/: the thread below a comment, depth-first,
+      paged by path ("load more"); ?depth=<n> limits how many levels
+    - Pagination: keyset cursor on (created_at, id), oldest first
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    pagination_class = OldestFirstKeysetPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
         post_id = self.request.query_params.get("post")
         if post_id:
             qs = qs.filter(post_id=post_id)
+        if self.request.query_params.get("top_level") in ("1", "true"):
+            qs = qs.filter(parent__isnull=True)
         return qs
 
+    @action(detail=True, methods=["get"], pagination_class=PathPagination)
+    def replies(self, request, pk=None):
+        comment = self.get_object()
+        replies = self.apply_query_plan(comment.descendants())
+        try:
+            levels = int(request.query_params["depth"])
+        except (KeyError, ValueError):
+            levels = None
+        if levels is not None:
+            replies = replies.filter(depth__lte=comment.depth + max(levels, 1))
+        page = self.paginate_queryset(replies)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
     def perform_create(self, serializer):
         if not self.request.user.is_authenticated:
             raise PermissionDenied("Authentication required.")
         serializer.save(author=self.request.user)
 
-class LikePostView(generics.GenericAPIView):
+class LikeToggleView(generics.GenericAPIView):
+    """
+    POST toggles the current user's like on a post. Send {"liked": true}
+    or {"liked": false} to set it instead; repeating that is a no-op.
+    Responds with the resulting state and like count.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        post = generics.get_object_or_404(Post, pk=pk)
-
-        # Prevent multiple likes
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
+        serializer = LikeToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        liked, changed, likes_count, author_id = like_post(request.user, pk, serializer.validated_data["liked"])
+        return Response({"liked": liked, "likes_count": likes_count})
 
-        if not created:
-            return Response({"detail": "Already liked"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create notification
-        if post.author != request.user:
-            Notification.objects.create(
-                recipient=post.author,
-                actor=request.user,
-                verb="liked your post",
-                target=post
-            )
+class LikePostView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response({"detail": "Post liked"}, status=status.HTTP_201_CREATED)
+    def post(self, request, pk):
+        liked, changed, likes_count, author_id = like_post(request.user, pk, True)
+        if not changed:
+            return Response({"detail": "Already liked"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "Post liked", "likes_count": likes_count}, status=status.HTTP_201_CREATED)
 
 
 class UnlikePostView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        post = generics.get_object_or_404(Post, pk=pk)
-        like = Like.objects.filter(user=request.user, post=post).first()
-
-        if like:
-            like.delete()
-            return Response({"detail": "Post unliked"}, status=status.HTTP_200_OK)
-
-        return Response({"detail": "You haven't liked this post"}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        liked, changed, likes_count, author_id = like_post(request.user, pk, False)
+        if not changed:
+            return Response({"detail": "You haven't liked this post"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "Post unliked", "likes_count": likes_count}, status=status.HTTP_200_OK)
+
+
+def like_post(user, post_id, liked):
+    """set_like() for a view: 404 for a missing post, and notify the author of a new like."""
+    try:
+        liked, changed, likes_count, author_id = set_like(user, post_id, liked)
+    except Post.DoesNotExist:
+        raise Http404
+    if liked and changed and author_id != user.pk:
+        notify(recipient=User(pk=author_id), actor=user, verb="liked your post", target=Post(pk=post_id))
+    return liked, changed, likes_count, author_id
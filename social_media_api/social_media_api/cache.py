@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class VersionedCache:
+    """
+    Cache of serialized representations keyed by object id and version.
+
+    Every object has a version key; its data lives under
+    "<prefix>:<pk>:<version>". Invalidating deletes the version key, so
+    the next read mints a new version and any entry a concurrent request
+    writes under the old one is simply never read. Version keys expire
+    with the data they guard, and are dropped again for ids that turn
+    out not to exist, so requests for made-up ids leave nothing behind.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    @property
+    def timeout(self):
+        return getattr(settings, "REPRESENTATION_CACHE_TIMEOUT", 60 * 60)
+
+    def version_key(self, pk):
+        return f"{self.prefix}:{pk}:v"
+
+    def data_key(self, pk, version, variant=""):
+        return f"{self.prefix}:{pk}:{version}:{variant}"
+
+    def get_versions(self, pks):
+        keys = {self.version_key(pk): pk for pk in pks}
+        found = cache.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            token = time.time_ns()
+            for key in missing:
+                cache.add(key, token, timeout=self.timeout)
+            # Another process may have won the add; read back what stuck.
+            found.update(cache.get_many(missing))
+        return {keys[key]: version for key, version in found.items()}
+
+    def get_many(self, pks, variant=""):
+        """Return ({pk: data} for cache hits, {pk: version} for all pks)."""
+        versions = self.get_versions(pks)
+        keys = {self.data_key(pk, version, variant): pk for pk, version in versions.items()}
+        hits = cache.get_many(keys)
+        return {keys[key]: data for key, data in hits.items()}, versions
+
+    def set_many(self, items, versions, variant=""):
+        cache.set_many(
+            {self.data_key(pk, versions[pk], variant): data for pk, data in items.items() if pk in versions},
+            timeout=self.timeout,
+        )
+
+    def invalidate(self, *pks):
+        if pks:
+            cache.delete_many([self.version_key(pk) for pk in pks])
+
+    def invalidate_on_commit(self, *pks):
+        # Invalidating before commit would let a concurrent read cache
+        # the old row under the new version.
+        transaction.on_commit(lambda: self.invalidate(*pks))
+
+    def fetch(self, pks, load, variant=""):
+        """
+        Representations for pks, in order, skipping ids that no longer
+        exist. `load(missing_pks)` must return {pk: data} for cache misses.
+        """
+        hits, versions = self.get_many(pks, variant)
+        missing = [pk for pk in pks if pk not in hits]
+        if missing:
+            fresh = load(missing)
+            self.set_many(fresh, versions, variant)
+            hits.update(fresh)
+            gone = [pk for pk in missing if pk not in fresh]
+            if gone:
+                self.invalidate(*gone)
+        return [hits[pk] for pk in pks if pk in hits]
@@ -0,0 +1,164 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a (timestamp, id) pair.
+
+    Each page is fetched with a WHERE on the last seen key instead of an
+    OFFSET, so page 1000 costs the same as page 1. `ordering` must be a
+    datetime field followed by a unique integer tie-breaker ("id" by
+    default), both in the same direction, and should be backed by a
+    composite index on those columns.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field = self.ordering[0].lstrip("-")
+        self.tiebreak = self.ordering[1].lstrip("-")
+        self.descending = self.ordering[0].startswith("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+        # Walking backwards flips both the comparison and the sort.
+        newer_first = self.descending != reverse
+        order = [f"-{self.field}", f"-{self.tiebreak}"] if newer_first else [self.field, self.tiebreak]
+        queryset = queryset.order_by(*order)
+
+        if cursor is not None:
+            lookup = "lt" if newer_first else "gt"
+            # The redundant lte/gte bound lets the database seek straight
+            # to the cursor in the index instead of scanning from the top.
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": cursor["value"]})
+                | Q(**{self.field: cursor["value"], f"{self.tiebreak}__{lookup}": cursor["id"]}),
+                **{f"{self.field}__{lookup}e": cursor["value"]},
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode("ascii")).decode("ascii"), keep_blank_values=True)
+            value = parse_datetime(tokens["v"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return {"value": value, "id": pk, "reverse": reverse}
+
+    def encode_cursor(self, obj, reverse):
+        tokens = {"v": getattr(obj, self.field).isoformat(), "i": getattr(obj, self.tiebreak)}
+        if reverse:
+            tokens["r"] = "1"
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class OldestFirstKeysetPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class PathPagination(KeysetPagination):
+    """
+    Forward-only "load more" pagination over a unique, sortable string
+    key, such as a comment's materialized path. The cursor is the key
+    of the last item on the previous page.
+    """
+    ordering = ("path",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field = self.ordering[0]
+
+        queryset = queryset.order_by(self.field)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(**{f"{self.field}__gt": cursor})
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next, self.has_previous = len(results) > self.page_size, False
+        self.page = results[:self.page_size]
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return b64decode(encoded.encode("ascii"), validate=True).decode("ascii")
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        encoded = b64encode(getattr(obj, self.field).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
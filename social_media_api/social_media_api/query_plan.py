@@ -0,0 +1,35 @@
+class QueryPlanSerializerMixin:
+    """
+    Lets a serializer declare the relations it reads, so a view can
+    fetch them up front instead of one query per row.
+
+    select_related / prefetch_related take anything the QuerySet
+    methods of the same name accept, including Prefetch objects.
+    """
+    select_related = ()
+    prefetch_related = ()
+
+    @classmethod
+    def apply_query_plan(cls, queryset):
+        if cls.select_related:
+            queryset = queryset.select_related(*cls.select_related)
+        if cls.prefetch_related:
+            queryset = queryset.prefetch_related(*cls.prefetch_related)
+        return queryset
+
+
+class QueryPlanViewMixin:
+    """
+    Applies the serializer's query plan to the view's queryset. Views
+    that override get_queryset() should pass their result through
+    apply_query_plan() themselves.
+    """
+
+    def apply_query_plan(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, QueryPlanSerializerMixin):
+            queryset = serializer_class.apply_query_plan(queryset)
+        return queryset
+
+    def get_queryset(self):
+        return self.apply_query_plan(super().get_queryset())
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -86,6 +87,44 @@ DATABASES = {
 }
 
 
+# Cache
+# Serialized posts and profiles are cached here. Production points
+# REDIS_URL at a Redis-protocol server; tests and local runs use locmem.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+REPRESENTATION_CACHE_TIMEOUT = 60 * 60
+
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.PooledHashingBackend"]
+
+# Login password checks run on a bounded thread pool: this many at once,
+# this many more waiting, and a login that cannot get a slot within
+# LOGIN_HASH_WAIT seconds is answered 429 instead of queueing.
+LOGIN_HASH_WORKERS = 4
+LOGIN_HASH_QUEUE = 16
+LOGIN_HASH_WAIT = 0.25
+
+# Login attempt limits checked before any hashing, per submitted username
+# and per client IP, as "attempts/period" over a sliding window.
+LOGIN_THROTTLE_RATES = {
+    "username": "10/min",
+    "ip": "30/min",
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,11 +176,52 @@ AUTH_USER_MODEL = "accounts.CustomUser"
 # DRF defaults (Token Auth)
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.SignedTokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
-}
\ No newline at end of file
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # Unset, client IPs (e.g. for the login throttle) are REMOTE_ADDR and
+    # the header is ignored, since clients can send any value in it.
+    "NUM_PROXIES": int(os.environ["NUM_PROXIES"]) if os.environ.get("NUM_PROXIES") else None,
+}
+
+# Authenticated tokens are remembered per process for this many seconds
+# (at most TOKEN_AUTH_CACHE_SIZE of them). Logout, a new token or a user
+# change clears the entry here at once; other processes within the TTL.
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 60
+
+# Signed "Bearer" tokens from login/register (accounts.tokens), in
+# seconds. Access tokens are verified without a database query;
+# refresh tokens are single use and exchanged at token/refresh/.
+ACCESS_TOKEN_LIFETIME = 5 * 60
+REFRESH_TOKEN_LIFETIME = 14 * 24 * 60 * 60
+
+# Logout, deactivation and single-use refresh are enforced through the
+# cache above, so signed tokens need it shared by every worker (Redis via
+# REDIS_URL). With the per-process locmem fallback they are neither
+# issued nor accepted, except under DEBUG (a single runserver process).
+SIGNED_TOKENS_ALLOW_LOCAL_CACHE = DEBUG
+
+# Home feed: authors above this follower count are merged in on read
+# instead of being fanned out to every follower's timeline on write.
+FEED_FANOUT_MAX_FOLLOWERS = 5000
+FEED_BACKFILL_LIMIT = 200
+
+# Notifications are queued in-process and written in batches by a
+# background thread. None disables the thread (flush manually).
+NOTIFICATION_FLUSH_INTERVAL = 1.0
+NOTIFICATION_BATCH_SIZE = 500
+
+# Read notifications older than this are removed by prune_notifications.
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Like counts from the like endpoints are accumulated in-process and
+# added to posts_post in one batched UPDATE per interval, so a viral post
+# is not updated once per like. None disables the thread (flush manually).
+LIKE_COUNT_FLUSH_INTERVAL = 1.0
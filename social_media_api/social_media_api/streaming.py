@@ -0,0 +1,50 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingListMixin:
+    """
+    Streaming mode for list views: with ?stream=true the whole result is
+    sent as {"results": [...]} instead of one page.
+
+    Rows are read with QuerySet.iterator(chunk_size) and serialized and
+    written a chunk at a time, so memory stays bounded however many rows
+    there are. They come in the pagination class's ordering.
+    """
+    stream_query_param = "stream"
+    stream_chunk_size = 500
+
+    def wants_stream(self):
+        return self.request.query_params.get(self.stream_query_param) in ("1", "true")
+
+    def serialize_chunk(self, rows):
+        return self.get_serializer(rows, many=True).data
+
+    def iter_chunks(self, queryset):
+        chunk = []
+        for row in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.stream_chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def stream_response(self, queryset):
+        ordering = getattr(self.pagination_class, "ordering", None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+
+        def render():
+            yield '{"results":['
+            separator = ""
+            for chunk in self.iter_chunks(queryset):
+                items = [json.dumps(item, cls=JSONEncoder, separators=(",", ":")) for item in self.serialize_chunk(chunk)]
+                if items:
+                    yield separator + ",".join(items)
+                    separator = ","
+            yield "]}"
+
+        return StreamingHttpResponse(render(), content_type="application/json")